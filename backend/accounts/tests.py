@@ -1,4 +1,24 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from metadent_backend.metrics import REGISTRY
 
+
+def login_attempts(result):
+    return REGISTRY.collect().get(f'login_attempts_total{{result="{result}"}}', 0)
+
+
+class LoginMetricsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        User.objects.create_user('staff', password='secret-pass')
+
+    def test_counts_attempts_by_result(self):
+        before = {result: login_attempts(result) for result in ('success', 'invalid', 'missing_credentials')}
+        self.client.post(reverse('login'), {'username': 'staff', 'password': 'secret-pass'}, format='json')
+        self.client.post(reverse('login'), {'username': 'staff', 'password': 'wrong'}, format='json')
+        self.client.post(reverse('login'), {'username': 'staff'}, format='json')
+        for result in before:
+            self.assertEqual(login_attempts(result), before[result] + 1, result)
@@ -5,6 +5,7 @@ from rest_framework.permissions import AllowAny
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.models import User
+from metadent_backend.metrics import LOGIN_ATTEMPTS
 from .models import UserProfile
 import logging
 
@@ -23,6 +24,7 @@ def login_view(request):
         password = request.data.get('password')
         
         if not username or not password:
+            LOGIN_ATTEMPTS.inc(result='missing_credentials')
             return Response({'error': 'Username and password are required'}, status=400)
         
         logger.info(f'Login attempt for user: {username}')
@@ -31,9 +33,11 @@ def login_view(request):
         
         if user is None:
             logger.warning(f'Invalid credentials for user: {username}')
+            LOGIN_ATTEMPTS.inc(result='invalid')
             return Response({'error': 'Invalid username or password'}, status=400)
         
         if not user.is_active:
+            LOGIN_ATTEMPTS.inc(result='disabled')
             return Response({'error': 'User account is disabled'}, status=400)
         
         login(request, user)
@@ -48,6 +52,7 @@ def login_view(request):
                 UserProfile.objects.get_or_create(user=user, defaults={'role': 'admin'})
         
         logger.info(f'User {username} logged in successfully with role {role}')
+        LOGIN_ATTEMPTS.inc(result='success')
         
         return Response({
             'user': {
@@ -62,6 +67,7 @@ def login_view(request):
     except Exception as e:
         import traceback
         logger.error(f'Login error: {traceback.format_exc()}')
+        LOGIN_ATTEMPTS.inc(result='error')
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -0,0 +1,142 @@
+"""
+Dữ liệu đơn vị hành chính Việt Nam (tỉnh / quận-huyện / phường-xã) nạp vào bộ nhớ.
+
+File `address/data/divisions.json` theo định dạng của provinces.open-api.vn
+(`/api/?depth=3`) và được cập nhật bằng `manage.py import_address_data`.
+Autocomplete dùng một mảng khóa đã sắp xếp + bisect (prefix index): mỗi đơn vị
+được đánh chỉ mục theo tên đã bỏ dấu bắt đầu từ từng từ, nên "chi minh"
+hay "ho chi" tìm được "Thành phố Hồ Chí Minh" mà không cần quét toàn bộ dữ liệu.
+"""
+import bisect
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+from metadent_backend.text import fold
+
+DATA_FILE = Path(__file__).resolve().parent / 'data' / 'divisions.json'
+
+LEVELS = ('province', 'district', 'ward')
+
+
+class Division:
+    __slots__ = ('code', 'name', 'level', 'parent')
+
+    def __init__(self, code, name, level, parent=None):
+        self.code = code
+        self.name = name
+        self.level = level
+        self.parent = parent
+
+    def as_dict(self):
+        data = {'code': self.code, 'name': self.name, 'level': self.level}
+        if self.parent is not None:
+            data['parent_code'] = self.parent.code
+        return data
+
+    def full_name(self):
+        parts = []
+        node = self
+        while node is not None:
+            parts.append(node.name)
+            node = node.parent
+        return ', '.join(parts)
+
+
+class AddressDataset:
+    def __init__(self, data):
+        self.by_level = {level: {} for level in LEVELS}
+        self.children = {}
+        self.provinces = []
+        keys = []
+
+        for province in data:
+            p = self._add(province, 'province', None, keys)
+            self.provinces.append(p)
+            for district in province.get('districts') or []:
+                d = self._add(district, 'district', p, keys)
+                for ward in district.get('wards') or []:
+                    self._add(ward, 'ward', d, keys)
+
+        keys.sort(key=lambda item: (item[0], LEVELS.index(item[1].level), item[1].code))
+        self._keys = [key for key, _ in keys]
+        self._entries = [entry for _, entry in keys]
+        # Đủ cả ba cấp: bản đi kèm repo có thể chỉ có cấp tỉnh (chưa chạy import_address_data)
+        self.complete = bool(self.by_level['ward']) and all(
+            self.children_of('province', p.code) for p in self.provinces
+        )
+        self.version = hashlib.md5(
+            json.dumps(data, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:16]
+
+    def _add(self, raw, level, parent, keys):
+        division = Division(int(raw['code']), raw['name'], level, parent)
+        self.by_level[level][division.code] = division
+        if parent is not None:
+            self.children.setdefault((parent.level, parent.code), []).append(division)
+
+        words = fold(division.name).split()
+        seen = set()
+        for i in range(len(words)):
+            key = ' '.join(words[i:])
+            if key not in seen:
+                seen.add(key)
+                keys.append((key, division))
+        return division
+
+    @classmethod
+    def from_file(cls, path=DATA_FILE):
+        with open(path, encoding='utf-8') as fh:
+            return cls(json.load(fh))
+
+    def get(self, level, code):
+        return self.by_level[level].get(code)
+
+    def children_of(self, level, code):
+        return self.children.get((level, code), [])
+
+    def search(self, query, level=None, parent_code=None, limit=10):
+        prefix = ' '.join(fold(query).split())
+        if not prefix:
+            return []
+
+        results = []
+        seen = set()
+        start = bisect.bisect_left(self._keys, prefix)
+        for index in range(start, len(self._keys)):
+            if not self._keys[index].startswith(prefix):
+                break
+            entry = self._entries[index]
+            if id(entry) in seen:
+                continue
+            if level and entry.level != level:
+                continue
+            if parent_code is not None and (entry.parent is None or entry.parent.code != parent_code):
+                continue
+            seen.add(id(entry))
+            results.append(entry)
+            if len(results) >= limit:
+                break
+        return results
+
+
+_dataset = None
+_lock = threading.Lock()
+
+
+def get_dataset():
+    global _dataset
+    if _dataset is None:
+        with _lock:
+            if _dataset is None:
+                _dataset = AddressDataset.from_file(getattr(settings, 'ADDRESS_DATA_FILE', DATA_FILE))
+    return _dataset
+
+
+def reset_dataset():
+    global _dataset
+    with _lock:
+        _dataset = None
@@ -0,0 +1,63 @@
+"""
+Management command to refresh address/data/divisions.json from provinces.open-api.vn
+"""
+import json
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+from address.dataset import DATA_FILE, AddressDataset
+
+SOURCE_URL = 'https://provinces.open-api.vn/api/?depth=3'
+
+
+def _normalize(provinces):
+    return [
+        {
+            'code': province['code'],
+            'name': province['name'],
+            'districts': [
+                {
+                    'code': district['code'],
+                    'name': district['name'],
+                    'wards': [
+                        {'code': ward['code'], 'name': ward['name']}
+                        for ward in district.get('wards') or []
+                    ],
+                }
+                for district in province.get('districts') or []
+            ],
+        }
+        for province in provinces
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Download (or read) the province/district/ward dataset and store it for the address API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=SOURCE_URL, help='Source URL (open-api depth=3 format)')
+        parser.add_argument('--file', help='Read from a local JSON file instead of downloading')
+
+    def handle(self, *args, **options):
+        try:
+            if options['file']:
+                with open(options['file'], encoding='utf-8') as fh:
+                    raw = json.load(fh)
+            else:
+                self.stdout.write(f"Downloading {options['url']} ...")
+                with urlopen(options['url'], timeout=60) as response:
+                    raw = json.load(response)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Không thể tải dữ liệu địa chỉ: {e}')
+
+        data = _normalize(raw)
+        dataset = AddressDataset(data)
+        with open(DATA_FILE, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh, ensure_ascii=False, separators=(',', ':'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Saved {len(dataset.by_level['province'])} provinces, "
+            f"{len(dataset.by_level['district'])} districts, "
+            f"{len(dataset.by_level['ward'])} wards (version {dataset.version})"
+        ))
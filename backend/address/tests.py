@@ -0,0 +1,99 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from . import dataset as dataset_module
+from .dataset import AddressDataset
+
+SAMPLE = [
+    {'code': 79, 'name': 'Thành phố Hồ Chí Minh', 'districts': [
+        {'code': 1, 'name': 'Quận Bình Thạnh', 'wards': [
+            {'code': 10, 'name': 'Phường 19'},
+            {'code': 11, 'name': 'Phường 22'},
+        ]},
+        {'code': 2, 'name': 'Thành phố Thủ Đức', 'wards': [
+            {'code': 20, 'name': 'Phường Thảo Điền'},
+        ]},
+    ]},
+    {'code': 48, 'name': 'Thành phố Đà Nẵng', 'districts': [
+        {'code': 3, 'name': 'Quận Hải Châu', 'wards': []},
+    ]},
+]
+
+
+class AddressDatasetTests(SimpleTestCase):
+    def setUp(self):
+        self.dataset = AddressDataset(SAMPLE)
+
+    def test_accent_insensitive_prefix_search(self):
+        names = [d.name for d in self.dataset.search('ho chi')]
+        self.assertEqual(names, ['Thành phố Hồ Chí Minh'])
+        names = [d.name for d in self.dataset.search('THU DU')]
+        self.assertEqual(names, ['Thành phố Thủ Đức'])
+        self.assertEqual([d.name for d in self.dataset.search('da nang')], ['Thành phố Đà Nẵng'])
+
+    def test_search_filters(self):
+        cities = self.dataset.search('thanh pho', level='province')
+        self.assertEqual({d.code for d in cities}, {79, 48})
+        wards = self.dataset.search('phuong', level='ward', parent_code=1)
+        self.assertEqual([d.code for d in wards], [10, 11])
+
+    def test_full_name(self):
+        self.assertEqual(
+            self.dataset.get('ward', 20).full_name(),
+            'Phường Thảo Điền, Thành phố Thủ Đức, Thành phố Hồ Chí Minh'
+        )
+
+
+class AddressApiTests(SimpleTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.original = dataset_module._dataset
+        dataset_module._dataset = AddressDataset(SAMPLE)
+
+    def tearDown(self):
+        dataset_module._dataset = self.original
+
+    def test_lists_with_cache_headers(self):
+        response = self.client.get(reverse('address-provinces'))
+        self.assertEqual(response.data, [
+            {'code': 79, 'name': 'Thành phố Hồ Chí Minh'}, {'code': 48, 'name': 'Thành phố Đà Nẵng'}
+        ])
+        version = response['X-Address-Dataset-Version']
+        self.assertEqual(response['ETag'], f'"{version}"')
+        self.assertIn('max-age=86400', response['Cache-Control'])
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+        # Chỉ URL kèm version mới immutable
+        response = self.client.get(reverse('address-wards', args=[1]), {'v': version})
+        self.assertEqual([w['code'] for w in response.data], [10, 11])
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.client.get(reverse('address-districts', args=[999])).status_code, 404)
+
+    def test_revalidation_returns_304(self):
+        etag = self.client.get(reverse('address-provinces'))['ETag']
+        response = self.client.get(reverse('address-provinces'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_empty_or_incomplete_data_is_not_cached_long(self):
+        version = dataset_module._dataset.version
+        response = self.client.get(reverse('address-wards', args=[3]), {'v': version})
+        self.assertEqual(response.data, [])
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+        dataset_module._dataset = AddressDataset([{'code': 1, 'name': 'Thành phố Hà Nội', 'districts': []}])
+        self.assertFalse(dataset_module._dataset.complete)
+        response = self.client.get(reverse('address-provinces'), {'v': dataset_module._dataset.version})
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_resolve(self):
+        response = self.client.get(reverse('address-resolve'), {'province': 79, 'district': 1, 'ward': 11})
+        self.assertEqual(response.data['full_name'], 'Phường 22, Quận Bình Thạnh, Thành phố Hồ Chí Minh')
+
+    def test_bundled_dataset_loads(self):
+        bundled = AddressDataset.from_file()
+        self.assertEqual(len(bundled.provinces), 63)
+        self.assertTrue(bundled.complete)
+        self.assertEqual(bundled.get('district', 760).full_name(), 'Quận 1, Thành phố Hồ Chí Minh')
+        self.assertIn('Phường Bến Nghé', [ward.name for ward in bundled.children_of('district', 760)])
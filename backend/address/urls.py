@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('provinces/', views.province_list, name='address-provinces'),
+    path('provinces/<int:code>/districts/', views.district_list, name='address-districts'),
+    path('districts/<int:code>/wards/', views.ward_list, name='address-wards'),
+    path('search/', views.address_search, name='address-search'),
+    path('resolve/', views.address_resolve, name='address-resolve'),
+]
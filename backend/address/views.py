@@ -0,0 +1,101 @@
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from .dataset import LEVELS, get_dataset
+
+# Dữ liệu hành chính gần như không đổi. Chỉ URL có ?v=<version của dataset> mới
+# được cache immutable (đổi dataset là đổi URL); URL không kèm version được cache
+# một ngày rồi revalidate bằng ETag. Dữ liệu rỗng hoặc dataset thiếu cấp
+# (chưa import) luôn phải revalidate để client nhận dữ liệu mới ngay khi có.
+CACHE_MAX_AGE = 60 * 60 * 24 * 30
+UNVERSIONED_MAX_AGE = 60 * 60 * 24
+VERSION_HEADER = 'X-Address-Dataset-Version'
+
+
+def _cached(request, response, dataset, empty=False):
+    etag = quote_etag(dataset.version)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        response = not_modified
+    if empty or not dataset.complete:
+        patch_cache_control(response, no_cache=True)
+    elif request.query_params.get('v') == dataset.version:
+        patch_cache_control(response, public=True, max_age=CACHE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=UNVERSIONED_MAX_AGE)
+    response['ETag'] = etag
+    response[VERSION_HEADER] = dataset.version
+    return response
+
+
+def _options(divisions):
+    return [{'code': d.code, 'name': d.name} for d in divisions]
+
+
+@api_view(['GET'])
+def province_list(request):
+    dataset = get_dataset()
+    options = _options(dataset.provinces)
+    return _cached(request, Response(options), dataset, empty=not options)
+
+
+@api_view(['GET'])
+def district_list(request, code):
+    dataset = get_dataset()
+    if dataset.get('province', code) is None:
+        return Response({'error': f'Tỉnh/thành phố {code} không tồn tại'}, status=status.HTTP_404_NOT_FOUND)
+    options = _options(dataset.children_of('province', code))
+    return _cached(request, Response(options), dataset, empty=not options)
+
+
+@api_view(['GET'])
+def ward_list(request, code):
+    dataset = get_dataset()
+    if dataset.get('district', code) is None:
+        return Response({'error': f'Quận/huyện {code} không tồn tại'}, status=status.HTTP_404_NOT_FOUND)
+    options = _options(dataset.children_of('district', code))
+    return _cached(request, Response(options), dataset, empty=not options)
+
+
+@api_view(['GET'])
+def address_search(request):
+    """
+    Autocomplete không phân biệt dấu: ?q=ho chi&level=province&parent=79&limit=10
+    """
+    dataset = get_dataset()
+    level = request.query_params.get('level') or None
+    if level is not None and level not in LEVELS:
+        return Response({'error': f'level phải là một trong {", ".join(LEVELS)}'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        parent = request.query_params.get('parent')
+        parent = int(parent) if parent else None
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+    except ValueError:
+        return Response({'error': 'parent và limit phải là số'}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = dataset.search(request.query_params.get('q', ''), level=level, parent_code=parent, limit=limit)
+    return _cached(request, Response([d.as_dict() for d in results]), dataset, empty=not results)
+
+
+@api_view(['GET'])
+def address_resolve(request):
+    """
+    Tên đầy đủ "Phường, Quận, Tỉnh" từ mã cấp thấp nhất: ?province=..&district=..&ward=..
+    """
+    dataset = get_dataset()
+    for level in reversed(LEVELS):
+        code = request.query_params.get(level)
+        if not code:
+            continue
+        try:
+            division = dataset.get(level, int(code))
+        except ValueError:
+            division = None
+        if division is None:
+            return Response({'error': f'Không tìm thấy {level} {code}'}, status=status.HTTP_404_NOT_FOUND)
+        payload = {**division.as_dict(), 'full_name': division.full_name()}
+        return _cached(request, Response(payload), dataset)
+    return Response({'error': 'Cần ít nhất một mã province, district hoặc ward'}, status=status.HTTP_400_BAD_REQUEST)
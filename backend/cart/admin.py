@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Order, OrderItem
+from .export import streaming_export
 
 
 class OrderItemInline(admin.TabularInline):
@@ -18,6 +19,7 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = ['customer_name', 'customer_email', 'customer_phone']
     readonly_fields = ['created_at', 'updated_at']
     inlines = [OrderItemInline]
+    actions = ['export_csv', 'export_ndjson']
     
     fieldsets = (
         ('Thông tin khách hàng', {
@@ -30,3 +32,11 @@ class OrderAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at')
         }),
     )
+
+    def export_csv(self, request, queryset):
+        return streaming_export(queryset, 'csv')
+    export_csv.short_description = 'Xuất CSV các đơn hàng đã chọn'
+
+    def export_ndjson(self, request, queryset):
+        return streaming_export(queryset, 'ndjson')
+    export_ndjson.short_description = 'Xuất NDJSON các đơn hàng đã chọn'
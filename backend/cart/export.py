@@ -0,0 +1,104 @@
+"""
+Xuất đơn hàng dạng CSV / NDJSON bằng StreamingHttpResponse.
+
+Dữ liệu được đọc bằng một query duy nhất trên Order (LEFT JOIN OrderItem,
+Product), sắp xếp theo đơn hàng và đọc theo từng chunk với iterator(), nên bộ
+nhớ không phụ thuộc số lượng đơn hàng. Đơn hàng không có item vẫn được xuất
+(CSV: một dòng với các cột item để trống; NDJSON: "items": []). NDJSON gom các
+dòng liên tiếp cùng order_id thành một object mỗi dòng.
+"""
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+
+CHUNK_SIZE = 2000
+
+ORDER_FIELDS = [
+    'order_id', 'created_at', 'status', 'customer_name', 'customer_email',
+    'customer_phone', 'customer_address', 'total_amount',
+]
+ITEM_FIELDS = ['product_id', 'product_name', 'quantity', 'price']
+
+_COLUMNS = [
+    'pk', 'created_at', 'status', 'customer_name', 'customer_email',
+    'customer_phone', 'customer_address', 'total_amount',
+    'items__product_id', 'items__product__name', 'items__quantity', 'items__price',
+]
+
+
+def export_rows(orders):
+    """Các tuple (order..., item...) của những đơn hàng trong queryset `orders`"""
+    return (
+        orders.order_by('pk', 'items__id')
+        .values_list(*_COLUMNS)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def filter_orders(queryset, status=None, date_from=None, date_to=None):
+    """date_from / date_to là date, tính trọn ngày theo TIME_ZONE"""
+    if status:
+        queryset = queryset.filter(status=status)
+    if date_from:
+        queryset = queryset.filter(created_at__gte=_start_of_day(date_from))
+    if date_to:
+        queryset = queryset.filter(created_at__lt=_start_of_day(date_to + timedelta(days=1)))
+    return queryset
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _format_value(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    # BOM để Excel đọc đúng tiếng Việt
+    yield '\ufeff' + writer.writerow(ORDER_FIELDS + ITEM_FIELDS)
+    for row in rows:
+        yield writer.writerow([_format_value(value) for value in row])
+
+
+def iter_ndjson(rows):
+    current_id = None
+    current = None
+    order_len = len(ORDER_FIELDS)
+    for row in rows:
+        if row[0] != current_id:
+            if current is not None:
+                yield json.dumps(current, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+            current_id = row[0]
+            current = dict(zip(ORDER_FIELDS, row[:order_len]))
+            current['items'] = []
+        # quantity NULL: đơn hàng không có item (LEFT JOIN)
+        if row[order_len + ITEM_FIELDS.index('quantity')] is not None:
+            current['items'].append(dict(zip(ITEM_FIELDS, row[order_len:])))
+    if current is not None:
+        yield json.dumps(current, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv; charset=utf-8'),
+    'ndjson': (iter_ndjson, 'application/x-ndjson; charset=utf-8'),
+}
+
+
+def streaming_export(orders, export_format='csv'):
+    iterator, content_type = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(iterator(export_rows(orders)), content_type=content_type)
+    filename = f"orders-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,104 @@
+"""
+Hỗ trợ header Idempotency-Key cho các API POST (hiện dùng cho create_order).
+
+Request đầu tiên với một key được xử lý bình thường và response (2xx/4xx) được
+lưu lại; các request lặp lại cùng key nhận đúng response đó mà không chạy lại
+view. Lỗi 5xx không được lưu để client có thể thử lại.
+
+Key đang xử lý (response_status rỗng) trả 409 trong thời hạn IDEMPOTENCY_LEASE.
+Quá hạn đó coi như worker đã chết giữa chừng: request tiếp theo với key này
+được nhận xử lý lại thay vì bị khóa tới khi hết IDEMPOTENCY_KEY_TTL.
+"""
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+DEFAULT_TTL = timedelta(hours=24)
+DEFAULT_LEASE = timedelta(seconds=60)
+
+
+def get_ttl():
+    return getattr(settings, 'IDEMPOTENCY_KEY_TTL', DEFAULT_TTL)
+
+
+def get_lease():
+    return getattr(settings, 'IDEMPOTENCY_LEASE', DEFAULT_LEASE)
+
+
+def request_hash(data):
+    raw = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _replay(record, digest):
+    if record.request_hash != digest:
+        return Response(
+            {'error': f'{HEADER} đã được dùng cho một request khác'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    if record.response_status is None:
+        return Response(
+            {'error': 'Request với key này đang được xử lý'},
+            status=status.HTTP_409_CONFLICT
+        )
+    response = Response(record.response_body, status=record.response_status)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view_func):
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view_func(request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({'error': f'{HEADER} quá dài'}, status=status.HTTP_400_BAD_REQUEST)
+
+        digest = request_hash(request.data)
+        now = timezone.now()
+        # Key hết hạn, hoặc đang xử lý quá lease (worker chết giữa request): nhận lại key
+        IdempotencyKey.objects.filter(key=key).filter(
+            Q(expires_at__lte=now) | Q(response_status__isnull=True, created_at__lte=now - get_lease())
+        ).delete()
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(key=key, request_hash=digest, expires_at=now + get_ttl())
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(key=key).first()
+            if record is None:
+                return Response({'error': 'Request với key này đang được xử lý'}, status=status.HTTP_409_CONFLICT)
+            return _replay(record, digest)
+
+        try:
+            response = view_func(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 500:
+            record.delete()
+        else:
+            record.response_status = response.status_code
+            record.response_body = response.data
+            record.save(update_fields=['response_status', 'response_body'])
+        return response
+
+    return wrapper
+
+
+def purge_expired(now=None):
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=now or timezone.now()).delete()
+    return deleted
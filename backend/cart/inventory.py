@@ -0,0 +1,80 @@
+"""
+Giữ hàng (trừ kho) khi tạo đơn hàng.
+
+- Các dòng Product được khóa bằng SELECT ... FOR UPDATE theo thứ tự id tăng dần,
+  nên hai checkout chứa cùng tập sản phẩm luôn khóa theo cùng một thứ tự (không deadlock).
+- Kho được trừ bằng một câu UPDATE có điều kiện `stock >= qty` cho mọi sản phẩm,
+  không đọc-sửa-ghi trong Python, nên không bao giờ âm kể cả khi backend
+  không hỗ trợ FOR UPDATE (SQLite).
+- stock = NULL nghĩa là sản phẩm không theo dõi tồn kho.
+"""
+import random
+import time
+
+from django.db import OperationalError
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Now
+
+from metadent_backend.caching import invalidate_rows
+from products.models import Product
+
+
+class OutOfStock(Exception):
+    def __init__(self, product, requested):
+        self.product = product
+        self.requested = requested
+        super().__init__(f'{product.name} chỉ còn {product.stock} sản phẩm')
+
+
+def lock_products(product_ids):
+    return {
+        product.pk: product
+        for product in Product.objects.select_for_update().filter(pk__in=product_ids).order_by('pk')
+    }
+
+
+def reserve_stock(products, quantities):
+    """
+    products: {id: Product} đã khóa, quantities: {id: số lượng}.
+    Raise OutOfStock nếu bất kỳ sản phẩm nào không đủ hàng.
+    """
+    tracked = {pk: qty for pk, qty in sorted(quantities.items()) if products[pk].stock is not None}
+    for pk, qty in tracked.items():
+        if products[pk].stock < qty:
+            raise OutOfStock(products[pk], qty)
+    if not tracked:
+        return
+
+    delta = Case(
+        *[When(pk=pk, then=Value(qty)) for pk, qty in tracked.items()],
+        output_field=IntegerField()
+    )
+    updated = Product.objects.filter(pk__in=tracked, stock__gte=delta).update(
+        stock=F('stock') - delta, updated_at=Now()
+    )
+    if updated != len(tracked):
+        # Kho đã bị checkout khác trừ giữa lúc đọc và lúc UPDATE
+        current = dict(Product.objects.filter(pk__in=tracked).values_list('pk', 'stock'))
+        for pk, qty in tracked.items():
+            if current.get(pk) is None or current[pk] < qty:
+                products[pk].stock = current.get(pk) or 0
+                raise OutOfStock(products[pk], qty)
+        raise OutOfStock(products[next(iter(tracked))], tracked[next(iter(tracked))])
+    for pk, qty in tracked.items():
+        products[pk].stock -= qty
+    # queryset.update không phát post_save: chỉ invalidate trang chi tiết của sản phẩm vừa trừ kho
+    invalidate_rows(Product, tracked)
+
+
+def retry_on_lock_conflict(func, attempts=8, base_delay=0.005):
+    """
+    Chạy lại func() khi database báo khóa/deadlock (SQLite "database is locked",
+    PostgreSQL deadlock/lock timeout). func phải tự mở transaction của nó.
+    """
+    for attempt in range(attempts):
+        try:
+            return func()
+        except OperationalError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(base_delay * (2 ** attempt) * random.uniform(0.5, 1.5))
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from cart.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = 'Incrementally refresh the daily sales rollup tables (run periodically, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild all rollups from scratch')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        refreshed = refresh_rollups(full=options['full'])
+        elapsed = time.perf_counter() - started
+        scope = 'all days' if refreshed is None else f'{refreshed} changed days'
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {scope} in {elapsed:.2f}s'))
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_stock'),
+        ('cart', '0004_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyOrderRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Ngày')),
+                ('status', models.CharField(choices=[('pending', 'Chờ xử lý'), ('processing', 'Đang xử lý'), ('shipped', 'Đã gửi hàng'), ('delivered', 'Đã giao hàng'), ('cancelled', 'Đã hủy')], max_length=20, verbose_name='Trạng thái')),
+                ('orders', models.PositiveIntegerField(default=0, verbose_name='Số đơn hàng')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Doanh thu')),
+            ],
+            options={
+                'verbose_name': 'Tổng hợp đơn hàng theo ngày',
+                'verbose_name_plural': 'Tổng hợp đơn hàng theo ngày',
+                'ordering': ['-day', 'status'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Ngày')),
+                ('status', models.CharField(choices=[('pending', 'Chờ xử lý'), ('processing', 'Đang xử lý'), ('shipped', 'Đã gửi hàng'), ('delivered', 'Đã giao hàng'), ('cancelled', 'Đã hủy')], max_length=20, verbose_name='Trạng thái')),
+                ('category', models.CharField(choices=[('water_flosser', 'Máy tăm nước'), ('electric_brush', 'Bàn chải điện'), ('mouthwash', 'Nước súc miệng'), ('other', 'Sản phẩm khác')], max_length=20, verbose_name='Danh mục')),
+                ('orders', models.PositiveIntegerField(default=0, verbose_name='Số đơn hàng')),
+                ('quantity', models.PositiveIntegerField(default=0, verbose_name='Số lượng')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Doanh thu')),
+            ],
+            options={
+                'verbose_name': 'Tổng hợp doanh số sản phẩm theo ngày',
+                'verbose_name_plural': 'Tổng hợp doanh số sản phẩm theo ngày',
+                'ordering': ['-day', 'status', 'product'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.DateTimeField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Mốc tổng hợp',
+                'verbose_name_plural': 'Mốc tổng hợp',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['updated_at'], name='order_updated_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailysalesrollup',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='products.product', verbose_name='Sản phẩm'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyorderrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'status'), name='unique_daily_order_rollup'),
+        ),
+        migrations.AddIndex(
+            model_name='dailysalesrollup',
+            index=models.Index(fields=['day', 'category'], name='sales_rollup_day_cat_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailysalesrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'status', 'product'), name='unique_daily_sales_rollup'),
+        ),
+    ]
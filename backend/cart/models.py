@@ -1,3 +1,4 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from products.models import Product
 
@@ -28,6 +29,11 @@ class Order(models.Model):
         verbose_name = "Đơn hàng"
         verbose_name_plural = "Đơn hàng"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['updated_at'], name='order_updated_at_idx'),
+            models.Index(fields=['-created_at', 'id'], name='order_created_id_idx'),
+            models.Index(fields=['status', '-created_at', 'id'], name='order_status_created_id_idx'),
+        ]
     
     def __str__(self):
         return f"Đơn hàng #{self.id} - {self.customer_name}"
@@ -48,4 +54,83 @@ class OrderItem(models.Model):
     
     @property
     def total_price(self):
-        return self.price * self.quantity
\ No newline at end of file
+        return self.price * self.quantity
+
+
+class IdempotencyKey(models.Model):
+    """
+    Lưu response của create_order theo header Idempotency-Key để client retry
+    không tạo đơn hàng trùng. response_status rỗng nghĩa là request đang xử lý.
+    """
+    key = models.CharField(max_length=255, unique=True, verbose_name="Idempotency key")
+    request_hash = models.CharField(max_length=64, verbose_name="Hash dữ liệu request")
+    response_status = models.PositiveSmallIntegerField(blank=True, null=True, verbose_name="HTTP status")
+    response_body = models.JSONField(blank=True, null=True, encoder=DjangoJSONEncoder, verbose_name="Response")
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True, verbose_name="Hết hạn")
+
+    class Meta:
+        verbose_name = "Idempotency key"
+        verbose_name_plural = "Idempotency keys"
+
+    def __str__(self):
+        return self.key
+
+
+# Bảng tổng hợp doanh số theo ngày, được cập nhật bởi `manage.py refresh_sales_rollups`
+
+
+class DailyOrderRollup(models.Model):
+    day = models.DateField(verbose_name="Ngày")
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES, verbose_name="Trạng thái")
+    orders = models.PositiveIntegerField(default=0, verbose_name="Số đơn hàng")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Doanh thu")
+
+    class Meta:
+        verbose_name = "Tổng hợp đơn hàng theo ngày"
+        verbose_name_plural = "Tổng hợp đơn hàng theo ngày"
+        ordering = ['-day', 'status']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'status'], name='unique_daily_order_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status}: {self.orders}"
+
+
+class DailySalesRollup(models.Model):
+    day = models.DateField(verbose_name="Ngày")
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES, verbose_name="Trạng thái")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, verbose_name="Sản phẩm")
+    category = models.CharField(max_length=20, choices=Product.CATEGORY_CHOICES, verbose_name="Danh mục")
+    orders = models.PositiveIntegerField(default=0, verbose_name="Số đơn hàng")
+    quantity = models.PositiveIntegerField(default=0, verbose_name="Số lượng")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Doanh thu")
+
+    class Meta:
+        verbose_name = "Tổng hợp doanh số sản phẩm theo ngày"
+        verbose_name_plural = "Tổng hợp doanh số sản phẩm theo ngày"
+        ordering = ['-day', 'status', 'product']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'status', 'product'], name='unique_daily_sales_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'category'], name='sales_rollup_day_cat_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status} {self.product_id}: {self.quantity}"
+
+
+class RollupWatermark(models.Model):
+    """Mốc updated_at của Order đã được tổng hợp tới"""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.DateTimeField(blank=True, null=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Mốc tổng hợp"
+        verbose_name_plural = "Mốc tổng hợp"
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
@@ -0,0 +1,145 @@
+"""
+Tổng hợp doanh số theo ngày (DailyOrderRollup, DailySalesRollup).
+
+Mỗi lần refresh chỉ đọc các Order có updated_at sau watermark, lấy ra các ngày
+(theo created_at) bị ảnh hưởng và tính lại riêng những ngày đó bằng các query
+GROUP BY. Đổi trạng thái đơn hàng (pending -> shipped) vì vậy tự chuyển số liệu
+sang đúng nhóm mà không cần lưu đóng góp của từng đơn.
+
+Transaction commit sau lần refresh nhưng mang updated_at sớm hơn watermark
+(ghi lâu, đồng hồ lệch giữa các máy) vẫn được tính: mỗi lần refresh quét lại cả
+cửa sổ ROLLUP_SAFETY_LAG giây trước watermark. Tính lại một ngày là idempotent
+nên phần chồng lấn chỉ tốn thêm vài query GROUP BY.
+
+Xóa đơn hàng không làm thay đổi updated_at: chạy lại với `--full` sau khi xóa.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from metadent_backend.caching import invalidate_models
+from .models import DailyOrderRollup, DailySalesRollup, Order, OrderItem, RollupWatermark
+
+WATERMARK_NAME = 'daily_sales'
+DEFAULT_SAFETY_LAG = 300
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+
+def _day_bounds(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _changed_days(since, until):
+    changed = Order.objects.filter(updated_at__lte=until)
+    if since is not None:
+        changed = changed.filter(updated_at__gt=since)
+    return set(
+        changed.annotate(day=TruncDate('created_at'))
+        .order_by().values_list('day', flat=True).distinct()
+    )
+
+
+def _rebuild(days=None):
+    """Tính lại rollup cho `days` (None = toàn bộ lịch sử)"""
+    orders = Order.objects.annotate(day=TruncDate('created_at'))
+    items = OrderItem.objects.annotate(day=TruncDate('order__created_at'))
+    order_rollups = DailyOrderRollup.objects.all()
+    sales_rollups = DailySalesRollup.objects.all()
+    if days is not None:
+        # Giới hạn theo khoảng created_at để dùng được index, rồi lọc đúng ngày
+        start, end = _day_bounds(min(days)), _day_bounds(max(days) + timedelta(days=1))
+        orders = orders.filter(created_at__gte=start, created_at__lt=end, day__in=days)
+        items = items.filter(order__created_at__gte=start, order__created_at__lt=end, day__in=days)
+        order_rollups = order_rollups.filter(day__in=days)
+        sales_rollups = sales_rollups.filter(day__in=days)
+
+    order_rows = (
+        orders.order_by().values('day', 'status')
+        .annotate(orders=Count('id'), revenue=Sum('total_amount', output_field=MONEY))
+    )
+    sales_rows = (
+        items.order_by().values('day', 'order__status', 'product_id', 'product__category')
+        .annotate(
+            orders=Count('order_id', distinct=True),
+            # Đặt tên khác cột gốc để F('quantity') vẫn trỏ tới OrderItem.quantity
+            units=Sum('quantity'),
+            sales=Sum(F('price') * F('quantity'), output_field=MONEY),
+        )
+    )
+
+    order_rollups.delete()
+    sales_rollups.delete()
+    DailyOrderRollup.objects.bulk_create([DailyOrderRollup(**row) for row in order_rows], batch_size=1000)
+    DailySalesRollup.objects.bulk_create([
+        DailySalesRollup(
+            day=row['day'], status=row['order__status'], product_id=row['product_id'],
+            category=row['product__category'], orders=row['orders'],
+            quantity=row['units'], revenue=row['sales'],
+        )
+        for row in sales_rows
+    ], batch_size=1000)
+
+
+def refresh_rollups(full=False):
+    """
+    Cập nhật rollup từ watermark hiện tại. Trả về số ngày đã tính lại (None nếu full).
+    """
+    until = timezone.now()
+    with transaction.atomic():
+        watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=WATERMARK_NAME)
+        if full or watermark.value is None:
+            _rebuild()
+            refreshed = None
+        else:
+            lag = timedelta(seconds=getattr(settings, 'ROLLUP_SAFETY_LAG', DEFAULT_SAFETY_LAG))
+            days = _changed_days(watermark.value - lag, until)
+            if days:
+                _rebuild(days)
+            refreshed = len(days)
+        watermark.value = until
+        watermark.save()
+    # Số liệu /api/cart/stats/ đang cache được tính lại ở request kế tiếp
+    invalidate_models(RollupWatermark)
+    return refreshed
+
+
+def sales_stats(status=None, date_from=None, date_to=None, top=10):
+    """Số liệu cho /api/cart/stats/, chỉ đọc từ bảng rollup"""
+    order_rollups = DailyOrderRollup.objects.all()
+    sales_rollups = DailySalesRollup.objects.all()
+    filters = {}
+    if status:
+        filters['status'] = status
+    if date_from:
+        filters['day__gte'] = date_from
+    if date_to:
+        filters['day__lte'] = date_to
+    order_rollups = order_rollups.filter(**filters).order_by()
+    sales_rollups = sales_rollups.filter(**filters).order_by()
+
+    totals = order_rollups.aggregate(orders=Sum('orders'), revenue=Sum('revenue'))
+    totals['quantity'] = sales_rollups.aggregate(quantity=Sum('quantity'))['quantity']
+    watermark = RollupWatermark.objects.filter(name=WATERMARK_NAME).values_list('value', flat=True).first()
+
+    return {
+        'totals': {key: value or 0 for key, value in totals.items()},
+        'by_day': list(
+            order_rollups.values('day').annotate(orders=Sum('orders'), revenue=Sum('revenue')).order_by('day')
+        ),
+        'by_status': list(
+            order_rollups.values('status').annotate(orders=Sum('orders'), revenue=Sum('revenue')).order_by('status')
+        ),
+        'by_category': list(
+            sales_rollups.values('category')
+            .annotate(quantity=Sum('quantity'), revenue=Sum('revenue')).order_by('-revenue')
+        ),
+        'top_products': list(
+            sales_rollups.values('product_id', name=F('product__name'))
+            .annotate(quantity=Sum('quantity'), revenue=Sum('revenue')).order_by('-revenue', 'product_id')[:top]
+        ),
+        'refreshed_until': watermark,
+    }
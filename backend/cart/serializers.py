@@ -23,3 +23,30 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = ['id', 'customer_name', 'customer_email', 'customer_phone', 'customer_address', 
                  'total_amount', 'status', 'items', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class OrderItemSummarySerializer(serializers.ModelSerializer):
+    """Dòng đơn hàng rút gọn: chỉ id và tên sản phẩm thay vì cả ProductSerializer"""
+    product_id = serializers.IntegerField(source='product.id', read_only=True)
+    product_name = serializers.CharField(source='product.name', read_only=True)
+    total_price = serializers.ReadOnlyField()
+
+    class Meta:
+        model = OrderItem
+        fields = ['product_id', 'product_name', 'quantity', 'price', 'total_price']
+
+
+class OrderSummarySerializer(serializers.ModelSerializer):
+    """Dùng cho ?view=summary trên danh sách đơn hàng admin"""
+    items = OrderItemSummarySerializer(many=True, read_only=True)
+    item_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = ['id', 'customer_name', 'customer_email', 'customer_phone', 'total_amount', 'status',
+                 'item_count', 'items', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+    def get_item_count(self, obj):
+        # items đã được prefetch nên không phát sinh query
+        return sum(item.quantity for item in obj.items.all())
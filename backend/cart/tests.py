@@ -1,3 +1,496 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+import gzip
+import json
+import logging
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from metadent_backend.caching import response_cache
+from metadent_backend.metrics import CHECKOUT_FAILURES, REGISTRY, Registry
+from products.models import Product
+from .idempotency import purge_expired
+from .models import IdempotencyKey, Order, OrderItem, RollupWatermark
+from . import rollups
+from .rollups import refresh_rollups
+
+loadtest_logger = logging.getLogger('loadtest')
+
+CUSTOMER = {
+    'customer_name': 'Nguyễn Văn A',
+    'customer_email': 'a@example.com',
+    'customer_phone': '0901234567',
+    'customer_address': '19V Nguyễn Hữu Cảnh, Bình Thạnh, TP.HCM',
+}
+
+
+def make_products(count, price='100000', stock=None):
+    return Product.objects.bulk_create([
+        Product(
+            name=f'Sản phẩm {i}',
+            description='Mô tả',
+            price=Decimal(price),
+            image='products/test.jpg',
+            category='other',
+            stock=stock,
+        )
+        for i in range(count)
+    ])
+
+
+class CreateOrderTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def post_order(self, products, quantity=2):
+        return self.client.post(reverse('create-order'), {
+            'cart_items': [{'product_id': p.id, 'quantity': quantity} for p in products],
+            'customer': CUSTOMER,
+        }, format='json')
+
+    def test_creates_order_with_items(self):
+        products = make_products(3)
+        response = self.post_order(products)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Decimal(response.data['total_amount']), Decimal('600000'))
+        self.assertEqual(len(response.data['items']), 3)
+        self.assertEqual(OrderItem.objects.filter(order_id=response.data['id']).count(), 3)
+
+    def test_query_count_does_not_grow_with_cart_lines(self):
+        small = make_products(1)
+        large = make_products(20)
+        self.post_order(small)  # warm up content types / connection state
+
+        with self.assertNumQueries(6) as small_ctx:
+            self.assertEqual(self.post_order(small).status_code, 201)
+        with self.assertNumQueries(len(small_ctx.captured_queries)):
+            self.assertEqual(self.post_order(large).status_code, 201)
+
+    def test_unknown_product_rolls_back(self):
+        products = make_products(1)
+        response = self.client.post(reverse('create-order'), {
+            'cart_items': [{'product_id': products[0].id, 'quantity': 1}, {'product_id': 999999, 'quantity': 1}],
+            'customer': CUSTOMER,
+        }, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Order.objects.exists())
+
+
+def make_orders(count, products, status='pending'):
+    orders = Order.objects.bulk_create([
+        Order(total_amount=Decimal('0'), status=status, **CUSTOMER) for _ in range(count)
+    ])
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=product, quantity=1, price=product.price)
+        for order in orders for product in products
+    ])
+    return orders
+
+
+class OrderListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.products = make_products(3)
+
+    def test_listing_query_count_is_constant(self):
+        make_orders(2, self.products)
+        with self.assertNumQueries(2) as ctx:
+            response = self.client.get(reverse('order-list'))
+        self.assertEqual(len(response.data), 2)
+
+        make_orders(30, self.products)
+        with self.assertNumQueries(len(ctx.captured_queries)):
+            response = self.client.get(reverse('order-list'))
+        self.assertEqual(len(response.data), 32)
+        self.assertEqual(len(response.data[0]['items']), 3)
+
+    def test_status_filter_with_cursor(self):
+        make_orders(3, self.products, status='pending')
+        shipped = make_orders(5, self.products, status='shipped')
+
+        ids = []
+        response = self.client.get(reverse('order-list'), {'status': 'shipped', 'cursor': '', 'page_size': 2})
+        while True:
+            ids.extend(order['id'] for order in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(sorted(ids), sorted(order.id for order in shipped))
+
+    def test_summary_view(self):
+        make_orders(4, self.products)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('order-list'), {'view': 'summary'})
+        order = response.data[0]
+        self.assertEqual(order['item_count'], 3)
+        self.assertNotIn('customer_address', order)
+        self.assertEqual(
+            set(order['items'][0]), {'product_id', 'product_name', 'quantity', 'price', 'total_price'}
+        )
+
+
+class IdempotentCheckoutTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.products = make_products(2)
+        self.payload = {
+            'cart_items': [{'product_id': p.id, 'quantity': 1} for p in self.products],
+            'customer': CUSTOMER,
+        }
+
+    def post(self, payload, key='checkout-123'):
+        return self.client.post(reverse('create-order'), payload, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_returns_stored_response_without_new_order(self):
+        first = self.post(self.payload)
+        self.assertEqual(first.status_code, 201)
+        second = self.post(self.payload)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.json()['id'], first.json()['id'])
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_reused_with_different_body_is_rejected(self):
+        self.post(self.payload)
+        other = dict(self.payload, cart_items=self.payload['cart_items'][:1])
+        self.assertEqual(self.post(other).status_code, 422)
+
+    def test_in_flight_key_conflicts(self):
+        from .idempotency import request_hash
+        IdempotencyKey.objects.create(
+            key='checkout-123', request_hash=request_hash(self.payload),
+            expires_at=timezone.now() + timedelta(hours=1)
+        )
+        self.assertEqual(self.post(self.payload).status_code, 409)
+        self.assertFalse(Order.objects.exists())
+
+    def test_abandoned_in_flight_key_is_taken_over_after_lease(self):
+        from .idempotency import request_hash
+        record = IdempotencyKey.objects.create(
+            key='checkout-123', request_hash=request_hash(self.payload),
+            expires_at=timezone.now() + timedelta(hours=1)
+        )
+        # Worker giữ key đã chết từ 2 phút trước, không bao giờ ghi response
+        IdempotencyKey.objects.filter(pk=record.pk).update(created_at=timezone.now() - timedelta(minutes=2))
+        response = self.post(self.payload)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(IdempotencyKey.objects.get().response_status, 201)
+        self.assertEqual(self.post(self.payload)['Idempotent-Replayed'], 'true')
+
+    def test_expired_keys_are_purged_and_reusable(self):
+        self.post(self.payload)
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.post(self.payload).status_code, 201)
+        self.assertEqual(Order.objects.count(), 2)
+
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(purge_expired(), 1)
+
+
+class InventoryReservationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def post_order(self, lines):
+        return self.client.post(reverse('create-order'), {
+            'cart_items': [{'product_id': p.id, 'quantity': q} for p, q in lines],
+            'customer': CUSTOMER,
+        }, format='json')
+
+    def test_stock_is_decremented_across_duplicate_lines(self):
+        product, untracked = make_products(1, stock=5) + make_products(1)
+        response = self.post_order([(product, 2), (untracked, 4), (product, 1)])
+        self.assertEqual(response.status_code, 201)
+        product.refresh_from_db()
+        untracked.refresh_from_db()
+        self.assertEqual(product.stock, 2)
+        self.assertIsNone(untracked.stock)
+
+    def test_insufficient_stock_rolls_back_whole_order(self):
+        plenty, scarce = make_products(1, stock=10) + make_products(1, stock=1)
+        response = self.post_order([(plenty, 3), (scarce, 2)])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['product_id'], scarce.id)
+        self.assertEqual(response.data['available'], 1)
+        plenty.refresh_from_db()
+        self.assertEqual(plenty.stock, 10)
+        self.assertFalse(Order.objects.exists())
+
+    def test_invalid_quantity_is_rejected(self):
+        product = make_products(1, stock=5)[0]
+        self.assertEqual(self.post_order([(product, -3)]).status_code, 400)
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 5)
+
+    def test_query_count_constant_with_tracked_stock(self):
+        small = make_products(1, stock=100)
+        large = make_products(20, stock=100)
+        self.post_order([(p, 1) for p in small])
+        with self.assertNumQueries(7) as ctx:
+            self.assertEqual(self.post_order([(p, 1) for p in small]).status_code, 201)
+        with self.assertNumQueries(len(ctx.captured_queries)):
+            self.assertEqual(self.post_order([(p, 1) for p in large]).status_code, 201)
+
+
+class ConcurrentCheckoutTests(TransactionTestCase):
+    """
+    Nhiều checkout song song trên cùng một SKU: kho không bao giờ âm và
+    số hàng đã bán luôn khớp với số đơn hàng được tạo.
+    """
+    STOCK = 25
+    CHECKOUTS = 60
+    THREADS = 8
+
+    def checkout(self, product_id):
+        client = APIClient()
+        try:
+            return client.post(reverse('create-order'), {
+                'cart_items': [{'product_id': product_id, 'quantity': 1}],
+                'customer': CUSTOMER,
+            }, format='json').status_code
+        finally:
+            connection.close()
+
+    def test_parallel_checkouts_never_oversell(self):
+        product = make_products(1, stock=self.STOCK)[0]
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            statuses = list(executor.map(self.checkout, [product.id] * self.CHECKOUTS))
+        elapsed = time.perf_counter() - started
+
+        product.refresh_from_db()
+        created = statuses.count(201)
+        self.assertGreaterEqual(product.stock, 0)
+        self.assertEqual(product.stock, self.STOCK - created)
+        self.assertEqual(OrderItem.objects.filter(product=product).count(), created)
+        self.assertEqual(created, self.STOCK)
+        self.assertEqual(statuses.count(409), self.CHECKOUTS - self.STOCK)
+        loadtest_logger.info(
+            '%d checkouts / %d threads: %d created, %d out of stock, %.0f checkouts/s',
+            self.CHECKOUTS, self.THREADS, created, statuses.count(409), self.CHECKOUTS / elapsed
+        )
+
+
+class StatsStampedeTests(TransactionTestCase):
+    THREADS = 8
+
+    def setUp(self):
+        response_cache.clear()
+        make_orders(3, make_products(2), status='delivered')
+        refresh_rollups()
+
+    def fetch(self, barrier):
+        client = APIClient()
+        try:
+            barrier.wait()
+            return client.get(reverse('order-stats'))
+        finally:
+            connection.close()
+
+    def test_concurrent_requests_compute_stats_once(self):
+        calls = []
+
+        def slow_stats(**filters):
+            calls.append(filters)
+            time.sleep(0.05)
+            return rollups.sales_stats(**filters)
+
+        barrier = threading.Barrier(self.THREADS)
+        with mock.patch('cart.views.sales_stats', side_effect=slow_stats):
+            with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+                responses = list(executor.map(self.fetch, [barrier] * self.THREADS))
+            self.assertEqual(len(calls), 1)
+            self.assertEqual({response.json()['totals']['orders'] for response in responses}, {3})
+
+            # Refresh rollup làm entry hết hiệu lực: tính lại đúng một lần
+            refresh_rollups()
+            self.client.get(reverse('order-stats'))
+            self.client.get(reverse('order-stats'))
+        self.assertEqual(len(calls), 2)
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.products = make_products(2)
+        self.pending = make_orders(2, self.products, status='pending')
+        self.shipped = make_orders(1, self.products, status='shipped')
+
+    def export(self, **params):
+        response = self.client.get(reverse('order-export'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv_has_one_row_per_item(self):
+        lines = self.export(type='csv').lstrip('\ufeff').splitlines()
+        self.assertTrue(lines[0].startswith('order_id,created_at,status'))
+        self.assertEqual(len(lines), 1 + 3 * 2)
+
+    def test_ndjson_groups_items_per_order_and_filters_status(self):
+        lines = self.export(type='ndjson', status='pending').splitlines()
+        orders = [json.loads(line) for line in lines]
+        self.assertEqual(sorted(o['order_id'] for o in orders), sorted(o.id for o in self.pending))
+        self.assertEqual(len(orders[0]['items']), 2)
+        self.assertEqual(orders[0]['customer_name'], CUSTOMER['customer_name'])
+
+    def test_orders_without_items_are_exported(self):
+        empty = Order.objects.create(total_amount=Decimal('0'), status='pending', **CUSTOMER)
+        lines = self.export(type='csv').lstrip('\ufeff').splitlines()
+        self.assertEqual(len(lines), 1 + 3 * 2 + 1)
+        self.assertEqual(lines[-1].split(',')[0], str(empty.pk))
+
+        orders = {o['order_id']: o for o in map(json.loads, self.export(type='ndjson').splitlines())}
+        self.assertEqual(len(orders), 4)
+        self.assertEqual(orders[empty.pk]['items'], [])
+        self.assertEqual(len(orders[self.shipped[0].pk]['items']), 2)
+
+    def test_date_range(self):
+        Order.objects.filter(pk=self.shipped[0].pk).update(created_at=timezone.now() - timedelta(days=10))
+        today = timezone.localdate().isoformat()
+        lines = self.export(type='ndjson', date_from=today, date_to=today).splitlines()
+        self.assertEqual(len(lines), 2)
+
+    def test_gzip_streaming(self):
+        response = self.client.get(reverse('order-export'), {'type': 'csv'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        body = gzip.decompress(b''.join(response.streaming_content)).decode('utf-8')
+        self.assertEqual(len(body.lstrip('\ufeff').splitlines()), 1 + 3 * 2)
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get(reverse('order-export'), {'type': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('order-export'), {'date_from': '18/10'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('order-export'), {'date_from': '2024-02-30'}).status_code, 400)
+
+
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.products = make_products(2, price='50000')
+        self.orders = make_orders(3, self.products, status='pending')
+        Order.objects.filter(pk__in=[o.pk for o in self.orders]).update(total_amount=Decimal('100000'))
+
+    def stats(self, **params):
+        response = self.client.get(reverse('order-stats'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_full_refresh(self):
+        self.assertIsNone(refresh_rollups())
+        data = self.stats()
+        self.assertEqual(data['totals']['orders'], 3)
+        self.assertEqual(data['totals']['revenue'], Decimal('300000'))
+        self.assertEqual(data['totals']['quantity'], 6)
+        self.assertEqual([row['status'] for row in data['by_status']], ['pending'])
+        self.assertEqual(data['by_category'][0]['category'], 'other')
+        self.assertEqual(len(data['top_products']), 2)
+        self.assertEqual(data['top_products'][0]['quantity'], 3)
+
+    def test_incremental_refresh_moves_status(self):
+        refresh_rollups()
+        Order.objects.filter(pk=self.orders[0].pk).update(status='shipped', updated_at=timezone.now())
+        self.assertEqual(refresh_rollups(), 1)
+
+        by_status = {row['status']: row['orders'] for row in self.stats()['by_status']}
+        self.assertEqual(by_status, {'pending': 2, 'shipped': 1})
+        self.assertEqual(self.stats(status='shipped')['totals']['quantity'], 2)
+        # Chỉ ngày nằm trong cửa sổ an toàn được tính lại, kết quả không đổi
+        self.assertEqual(refresh_rollups(), 1)
+        self.assertEqual({row['status']: row['orders'] for row in self.stats()['by_status']}, by_status)
+
+    @override_settings(ROLLUP_SAFETY_LAG=0)
+    def test_unchanged_data_outside_safety_window_is_skipped(self):
+        Order.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        refresh_rollups()
+        self.assertEqual(refresh_rollups(), 0)
+
+    def test_late_commit_before_watermark_is_counted(self):
+        refresh_rollups()
+        watermark = RollupWatermark.objects.get().value
+        # Transaction bắt đầu trước refresh nhưng commit sau: updated_at < watermark
+        late = make_orders(1, self.products, status='pending')[0]
+        Order.objects.filter(pk=late.pk).update(
+            total_amount=Decimal('100000'), updated_at=watermark - timedelta(seconds=30)
+        )
+        refresh_rollups()
+        totals = self.stats()['totals']
+        self.assertEqual(totals['orders'], 4)
+        self.assertEqual(totals['revenue'], Decimal('400000'))
+
+    def test_stats_reads_only_rollups(self):
+        refresh_rollups()
+        with self.assertNumQueries(7):
+            self.stats(date_from=timezone.localdate().isoformat())
+
+    def test_date_filter_and_validation(self):
+        refresh_rollups()
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        self.assertEqual(self.stats(date_from=tomorrow.isoformat())['totals']['orders'], 0)
+        self.assertEqual(self.client.get(reverse('order-stats'), {'date_to': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('order-stats'), {'date_from': '2024-02-30'}).status_code, 400)
+
+
+class CheckoutMetricsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.product = make_products(1, stock=1)[0]
+
+    def order(self, quantity):
+        return self.client.post(reverse('create-order'), {
+            'cart_items': [{'product_id': self.product.id, 'quantity': quantity}],
+            'customer': CUSTOMER,
+        }, format='json')
+
+    def metric(self, key):
+        return REGISTRY.collect().get(key, 0)
+
+    def test_business_and_request_metrics(self):
+        created = self.metric('orders_created_total')
+        out_of_stock = self.metric('checkout_failures_total{reason="out_of_stock"}')
+        requests = self.metric('http_requests_total{view="create-order",method="POST",status="201"}')
+
+        self.assertEqual(self.order(1).status_code, 201)
+        self.assertEqual(self.order(1).status_code, 409)
+
+        self.assertEqual(self.metric('orders_created_total'), created + 1)
+        self.assertEqual(self.metric('checkout_failures_total{reason="out_of_stock"}'), out_of_stock + 1)
+        self.assertEqual(
+            self.metric('http_requests_total{view="create-order",method="POST",status="201"}'), requests + 1
+        )
+
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('http_request_duration_seconds_bucket{view="create-order",le="+Inf"}', body)
+        self.assertIn('http_request_db_queries_count{view="create-order"}', body)
+        self.assertIn('# TYPE orders_created_total counter', body)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_token_required_when_configured(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+
+    def test_values_are_summed_across_worker_files(self):
+        metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, metrics_dir, ignore_errors=True)
+        registry = Registry()
+        registry.register(CHECKOUT_FAILURES)
+        with override_settings(METRICS_DIR=metrics_dir, METRICS_FLUSH_INTERVAL=0):
+            registry.add([('checkout_failures_total{reason="out_of_stock"}', 2)])
+            # File của một worker khác
+            with open(f'{metrics_dir}/metrics-999999.json', 'w') as fh:
+                json.dump({'checkout_failures_total{reason="out_of_stock"}': 3}, fh)
+            self.assertIn('checkout_failures_total{reason="out_of_stock"} 5', registry.exposition())
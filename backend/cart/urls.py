@@ -4,5 +4,7 @@ from . import views
 urlpatterns = [
     path('order/', views.create_order, name='create-order'),
     path('orders/', views.OrderListAPIView.as_view(), name='order-list'),
+    path('orders/export/', views.export_orders, name='order-export'),
+    path('stats/', views.order_stats, name='order-stats'),
     path('orders/<int:pk>/', views.OrderDetailAPIView.as_view(), name='order-detail'),
 ]
@@ -3,15 +3,110 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import generics
 from django.db import transaction
-from .models import Order, OrderItem
-from .serializers import OrderSerializer
+from django.db.models import Prefetch, prefetch_related_objects
+from django.utils.dateparse import parse_date
+from .models import Order, OrderItem, RollupWatermark
+from .serializers import OrderSerializer, OrderSummarySerializer
+from .idempotency import idempotent
+from .export import EXPORT_FORMATS, filter_orders, streaming_export
+from .rollups import sales_stats
+from .inventory import OutOfStock, lock_products, reserve_stock, retry_on_lock_conflict
 from products.models import Product
+from metadent_backend.caching import cached
+from metadent_backend.metrics import CHECKOUT_FAILURES, ORDERS_CREATED
+from metadent_backend.pagination import KeysetPagination
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Số liệu chỉ đổi khi refresh rollup (có invalidate), TTL chỉ là lưới an toàn
+STATS_CACHE_TIMEOUT = 60
+
+# Items kèm product được nạp bằng 1 query cho cả danh sách đơn hàng
+ORDER_ITEMS_PREFETCH = Prefetch('items', queryset=OrderItem.objects.select_related('product'))
+# Bản rút gọn chỉ đọc các cột mà OrderSummarySerializer cần
+ORDER_SUMMARY_PREFETCH = Prefetch(
+    'items',
+    queryset=OrderItem.objects.select_related('product').only(
+        'order', 'product', 'quantity', 'price', 'product__name'
+    )
+)
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _date_filters(request):
+    """
+    ({'date_from': date, 'date_to': date}, None) từ query string, hoặc (None, response 400)
+    nếu ngày sai định dạng hoặc không tồn tại (2024-02-30)
+    """
+    dates = {}
+    for param in ('date_from', 'date_to'):
+        value = request.query_params.get(param)
+        if not value:
+            continue
+        try:
+            dates[param] = parse_date(value)
+        except ValueError:
+            dates[param] = None
+        if dates[param] is None:
+            return None, Response({'error': f'{param} phải có dạng YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+    return dates, None
+
+
+def _place_order(cart_items, customer_data, quantities):
+    """
+    Khóa sản phẩm, trừ kho và tạo đơn hàng trong một transaction
+    """
+    with transaction.atomic():
+        # Khóa và lấy toàn bộ sản phẩm trong giỏ bằng một query (theo thứ tự id)
+        products = lock_products(quantities)
+        for product_id in quantities:
+            if product_id not in products:
+                raise Product.DoesNotExist(product_id)
+        
+        reserve_stock(products, quantities)
+
+        # Calculate total amount
+        total_amount = 0
+        order_items = []
+        
+        for item in cart_items:
+            product = products[_to_int(item.get('product_id'))]
+            quantity = _to_int(item.get('quantity', 1))
+            
+            total_amount += product.price * quantity
+            order_items.append(OrderItem(
+                product=product,
+                quantity=quantity,
+                price=product.price
+            ))
+        
+        # Create order
+        order = Order.objects.create(
+            customer_name=customer_data['customer_name'],
+            customer_email=customer_data['customer_email'],
+            customer_phone=customer_data['customer_phone'],
+            customer_address=customer_data['customer_address'],
+            total_amount=total_amount
+        )
+        
+        # Create order items bằng một lệnh INSERT
+        for order_item in order_items:
+            order_item.order = order
+        OrderItem.objects.bulk_create(order_items)
+        # Nạp lại items cho response ngay trong transaction (không chạy lại query sau commit)
+        prefetch_related_objects([order], ORDER_ITEMS_PREFETCH)
+    return order
+
 
 @api_view(['POST'])
+@idempotent
 def create_order(request):
     """
     Tạo đơn hàng từ dữ liệu cart được gửi từ frontend
@@ -22,60 +117,49 @@ def create_order(request):
         customer_data = request.data.get('customer', {})
         
         if not cart_items:
+            CHECKOUT_FAILURES.inc(reason='empty_cart')
             return Response({'error': 'Giỏ hàng trống'}, status=status.HTTP_400_BAD_REQUEST)
         
         # Validate customer data
         required_fields = ['customer_name', 'customer_email', 'customer_phone', 'customer_address']
         for field in required_fields:
             if not customer_data.get(field):
+                CHECKOUT_FAILURES.inc(reason='invalid_customer')
                 return Response({'error': f'Thiếu thông tin: {field}'}, status=status.HTTP_400_BAD_REQUEST)
         
-        with transaction.atomic():
-            # Calculate total amount
-            total_amount = 0
-            order_items_data = []
-            
-            for item in cart_items:
-                product_id = item.get('product_id')
-                quantity = item.get('quantity', 1)
-                
-                try:
-                    product = Product.objects.get(id=product_id)
-                except Product.DoesNotExist:
-                    return Response({'error': f'Sản phẩm ID {product_id} không tồn tại'}, status=status.HTTP_404_NOT_FOUND)
-                
-                item_total = product.price * quantity
-                total_amount += item_total
-                
-                order_items_data.append({
-                    'product': product,
-                    'quantity': quantity,
-                    'price': product.price,
-                    'total_price': item_total
-                })
-            
-            # Create order
-            order = Order.objects.create(
-                customer_name=customer_data['customer_name'],
-                customer_email=customer_data['customer_email'],
-                customer_phone=customer_data['customer_phone'],
-                customer_address=customer_data['customer_address'],
-                total_amount=total_amount
-            )
-            
-            # Create order items
-            for item_data in order_items_data:
-                OrderItem.objects.create(
-                    order=order,
-                    product=item_data['product'],
-                    quantity=item_data['quantity'],
-                    price=item_data['price']
-                )
+        # Gộp số lượng theo sản phẩm
+        quantities = {}
+        for item in cart_items:
+            product_id = _to_int(item.get('product_id'))
+            quantity = _to_int(item.get('quantity', 1))
+            if product_id is None:
+                CHECKOUT_FAILURES.inc(reason='product_not_found')
+                return Response({'error': f"Sản phẩm ID {item.get('product_id')} không tồn tại"}, status=status.HTTP_404_NOT_FOUND)
+            if quantity is None or quantity < 1:
+                CHECKOUT_FAILURES.inc(reason='invalid_quantity')
+                return Response({'error': f'Số lượng không hợp lệ cho sản phẩm ID {product_id}'}, status=status.HTTP_400_BAD_REQUEST)
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+        
+        try:
+            order = retry_on_lock_conflict(lambda: _place_order(cart_items, customer_data, quantities))
+        except Product.DoesNotExist as e:
+            CHECKOUT_FAILURES.inc(reason='product_not_found')
+            return Response({'error': f'Sản phẩm ID {e} không tồn tại'}, status=status.HTTP_404_NOT_FOUND)
+        except OutOfStock as e:
+            CHECKOUT_FAILURES.inc(reason='out_of_stock')
+            return Response({
+                'error': f'Sản phẩm {e.product.name} không đủ hàng',
+                'product_id': e.product.pk,
+                'available': e.product.stock,
+                'requested': e.requested,
+            }, status=status.HTTP_409_CONFLICT)
         
+        ORDERS_CREATED.inc()
         serializer = OrderSerializer(order)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
         
     except Exception as e:
+        CHECKOUT_FAILURES.inc(reason='error')
         return Response({'error': f'Lỗi tạo đơn hàng: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -85,19 +169,61 @@ class OrderListAPIView(generics.ListAPIView):
     """
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
+    pagination_class = KeysetPagination
+
+    def is_summary(self):
+        return self.request.query_params.get('view') == 'summary'
+
+    def get_serializer_class(self):
+        if self.is_summary():
+            return OrderSummarySerializer
+        return OrderSerializer
 
     def get_queryset(self):
-        queryset = Order.objects.all()
+        if self.is_summary():
+            queryset = Order.objects.prefetch_related(ORDER_SUMMARY_PREFETCH)
+        else:
+            queryset = Order.objects.prefetch_related(ORDER_ITEMS_PREFETCH)
         status_filter = self.request.query_params.get('status', None)
         if status_filter:
             queryset = queryset.filter(status=status_filter)
-        return queryset.select_related()
+        return queryset
 
 
 class OrderDetailAPIView(generics.RetrieveUpdateAPIView):
     """
     Retrieve and update order status
     """
-    queryset = Order.objects.all()
+    queryset = Order.objects.prefetch_related(ORDER_ITEMS_PREFETCH)
     serializer_class = OrderSerializer
 
+
+@api_view(['GET'])
+def export_orders(request):
+    """
+    Xuất đơn hàng dạng stream: ?type=csv|ndjson&status=&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD
+    """
+    export_format = request.query_params.get('type', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return Response({'error': f'type phải là một trong {", ".join(EXPORT_FORMATS)}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    dates, error = _date_filters(request)
+    if error:
+        return error
+
+    orders = filter_orders(Order.objects.all(), status=request.query_params.get('status'), **dates)
+    return streaming_export(orders, export_format)
+
+
+@api_view(['GET'])
+def order_stats(request):
+    """
+    Thống kê doanh số đọc từ bảng rollup: ?date_from=&date_to=&status=
+    """
+    dates, error = _date_filters(request)
+    if error:
+        return error
+    filters = {'status': request.query_params.get('status') or None, **dates}
+    key = 'sales_stats:' + '|'.join(f'{name}={value}' for name, value in sorted(filters.items()))
+    # Một request tính lại khi hết hạn, các request đồng thời nhận bản cũ
+    return Response(cached(key, lambda: sales_stats(**filters), (RollupWatermark,), STATS_CACHE_TIMEOUT))
@@ -1,40 +1,174 @@
+import json
+import os
+import time
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db.models import Count, Q, Sum
+
+from cart.models import Order
 from cms.models import PageImage
 from products.models import Product
 
 
+def page_image_stats():
+    """Ảnh theo vị trí: một query GROUP BY position"""
+    rows = {
+        row['position']: row
+        for row in PageImage.objects.order_by().values('position').annotate(
+            total=Count('id'), active=Count('id', filter=Q(is_active=True))
+        )
+    }
+    positions = {}
+    for position, _label in PageImage.POSITION_CHOICES:
+        row = rows.pop(position, {'total': 0, 'active': 0})
+        positions[position] = {'active': row['active'], 'inactive': row['total'] - row['active']}
+    # Vị trí không còn trong POSITION_CHOICES vẫn được báo cáo
+    for position, row in rows.items():
+        positions[position] = {'active': row['active'], 'inactive': row['total'] - row['active']}
+    return {
+        'positions': positions,
+        'active': sum(p['active'] for p in positions.values()),
+        'inactive': sum(p['inactive'] for p in positions.values()),
+    }
+
+
+def product_stats():
+    """Sản phẩm theo danh mục: một query GROUP BY category"""
+    categories = {category: {'total': 0, 'with_images': 0, 'out_of_stock': 0}
+                  for category, _label in Product.CATEGORY_CHOICES}
+    for row in Product.objects.order_by().values('category').annotate(
+        total=Count('id'),
+        with_images=Count('id', filter=~Q(image='')),
+        out_of_stock=Count('id', filter=Q(stock=0)),
+    ):
+        category = row.pop('category')
+        categories[category] = row
+    return {
+        'categories': categories,
+        'total': sum(c['total'] for c in categories.values()),
+        'with_images': sum(c['with_images'] for c in categories.values()),
+    }
+
+
+def order_stats():
+    """Đơn hàng theo trạng thái: một query GROUP BY status"""
+    statuses = {status: {'count': 0, 'revenue': '0'} for status, _label in Order.STATUS_CHOICES}
+    for row in Order.objects.order_by().values('status').annotate(count=Count('id'), revenue=Sum('total_amount')):
+        statuses[row['status']] = {'count': row['count'], 'revenue': str(row['revenue'] or 0)}
+    return {
+        'statuses': statuses,
+        'total': sum(s['count'] for s in statuses.values()),
+    }
+
+
+def _dir_usage(path):
+    files = size = 0
+    stack = [path]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    files += 1
+                    size += entry.stat(follow_symlinks=False).st_size
+    return files, size
+
+
+def media_stats():
+    """Dung lượng MEDIA_ROOT theo thư mục cấp một (không query DB)"""
+    root = str(settings.MEDIA_ROOT)
+    directories = {}
+    if os.path.isdir(root):
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    key, (files, size) = entry.name, _dir_usage(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    key, files, size = '.', 1, entry.stat(follow_symlinks=False).st_size
+                else:
+                    continue
+                current = directories.setdefault(key, {'files': 0, 'bytes': 0})
+                current['files'] += files
+                current['bytes'] += size
+    return {
+        'directories': dict(sorted(directories.items())),
+        'files': sum(d['files'] for d in directories.values()),
+        'bytes': sum(d['bytes'] for d in directories.values()),
+    }
+
+
+SECTIONS = [
+    ('page_images', page_image_stats),
+    ('products', product_stats),
+    ('orders', order_stats),
+    ('media', media_stats),
+]
+
+
+def collect_stats():
+    """Chạy từng phần, trả về (report, timings tính bằng ms)"""
+    report, timings = {}, {}
+    for name, collect in SECTIONS:
+        started = time.perf_counter()
+        report[name] = collect()
+        timings[name] = round((time.perf_counter() - started) * 1000, 2)
+    return report, timings
+
+
+def _format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+
+
 class Command(BaseCommand):
     help = 'Show CMS statistics'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON (for monitoring)')
+
     def handle(self, *args, **options):
-        """Display statistics about CMS images and products"""
-        
+        """Display statistics about CMS images, products, orders and media"""
+        report, timings = collect_stats()
+
+        if options['json']:
+            report['timings_ms'] = timings
+            self.stdout.write(json.dumps(report, ensure_ascii=False))
+            return
+
         self.stdout.write('\n📊 CMS STATISTICS\n' + '='*50)
-        
-        # Count Page Images by position
-        self.stdout.write('\n📸 Page Images by Position:')
-        positions = [
-            'hero', 'tamnuoc_banner', 'banchaidien_banner', 
-            'nuocsucmieng_banner', 'sanphamkhac_banner',
-            'hero_section', 'story_section', 'ourteam_section'
-        ]
-        
-        for position in positions:
-            active_count = PageImage.objects.filter(position=position, is_active=True).count()
-            total_count = PageImage.objects.filter(position=position).count()
-            
-            status = '✓' if active_count > 0 else '✗'
+
+        images = report['page_images']
+        self.stdout.write(f'\n📸 Page Images by Position ({timings["page_images"]} ms):')
+        for position, counts in images['positions'].items():
+            status = '✓' if counts['active'] > 0 else '✗'
+            total = counts['active'] + counts['inactive']
+            self.stdout.write(f'  {status} {position:20s} - Active: {counts["active"]}/{total}')
+        self.stdout.write(f'  Active: {images["active"]}, inactive: {images["inactive"]}')
+
+        products = report['products']
+        self.stdout.write(f'\n📦 Products ({timings["products"]} ms):')
+        for category, counts in products['categories'].items():
             self.stdout.write(
-                f'  {status} {position:20s} - Active: {active_count}/{total_count}'
+                f'  {category:20s} - Total: {counts["total"]}, with images: {counts["with_images"]}, '
+                f'out of stock: {counts["out_of_stock"]}'
             )
-        
-        # Count Products
-        products_count = Product.objects.count()
-        products_with_images = Product.objects.exclude(image='').count()
-        
-        self.stdout.write(f'\n📦 Products:')
-        self.stdout.write(f'  Total: {products_count}')
-        self.stdout.write(f'  With images: {products_with_images}')
-        
-        self.stdout.write('\n' + '='*50 + '\n')
+        self.stdout.write(f'  Total: {products["total"]}')
+        self.stdout.write(f'  With images: {products["with_images"]}')
 
+        orders = report['orders']
+        self.stdout.write(f'\n🧾 Orders by Status ({timings["orders"]} ms):')
+        for status, counts in orders['statuses'].items():
+            self.stdout.write(f'  {status:20s} - {counts["count"]} ({counts["revenue"]} đ)')
+        self.stdout.write(f'  Total: {orders["total"]}')
+
+        media = report['media']
+        self.stdout.write(f'\n💾 Media ({timings["media"]} ms):')
+        for directory, usage in media['directories'].items():
+            self.stdout.write(f'  {directory:20s} - {usage["files"]} files, {_format_bytes(usage["bytes"])}')
+        self.stdout.write(f'  Total: {media["files"]} files, {_format_bytes(media["bytes"])}')
+
+        self.stdout.write('\n' + '='*50 + '\n')
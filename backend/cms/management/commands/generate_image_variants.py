@@ -0,0 +1,31 @@
+"""
+Management command to (re)generate responsive image variants for existing uploads
+"""
+from django.core.management.base import BaseCommand
+from cms.models import PageImage
+from metadent_backend.images import ensure_variants
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/JPEG variants for media/products and media/page_images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate variants even if they are already up to date',
+        )
+
+    def handle(self, *args, **options):
+        force = options['force']
+        for model in (Product, PageImage):
+            generated = skipped = 0
+            for instance in model.objects.exclude(image='').iterator(chunk_size=200):
+                if ensure_variants(instance, force=force):
+                    generated += 1
+                else:
+                    skipped += 1
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name}: {generated} generated, {skipped} skipped'
+            ))
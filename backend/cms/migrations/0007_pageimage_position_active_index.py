@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0006_delete_mediaasset'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pageimage',
+            index=models.Index(fields=['position', 'is_active', '-created_at'], name='pageimage_pos_active_idx'),
+        ),
+    ]
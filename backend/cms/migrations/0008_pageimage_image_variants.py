@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0007_pageimage_position_active_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pageimage',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Ảnh phái sinh'),
+        ),
+    ]
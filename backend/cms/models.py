@@ -19,6 +19,7 @@ class PageImage(models.Model):
     name = models.CharField(max_length=200, verbose_name="Tên")
     position = models.CharField(max_length=50, choices=POSITION_CHOICES, verbose_name="Vị trí")
     image = models.ImageField(upload_to='page_images/', verbose_name="Hình ảnh")
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Ảnh phái sinh")
     link_url = models.URLField(blank=True, null=True, verbose_name="URL liên kết")
     is_active = models.BooleanField(default=True, verbose_name="Kích hoạt")
     created_at = models.DateTimeField(auto_now_add=True)
@@ -28,6 +29,9 @@ class PageImage(models.Model):
         verbose_name = "Hình ảnh trang"
         verbose_name_plural = "Hình ảnh trang"
         ordering = ['position', '-created_at']
+        indexes = [
+            models.Index(fields=['position', 'is_active', '-created_at'], name='pageimage_pos_active_idx'),
+        ]
         # Removed unique_together to allow multiple images per position for slider support
     
     def __str__(self):
@@ -56,6 +60,7 @@ class SiteSetting(models.Model):
         default='other',
         verbose_name="Danh mục"
     )
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = "Cài đặt trang web"
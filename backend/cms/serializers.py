@@ -1,13 +1,19 @@
 from rest_framework import serializers
+from metadent_backend.images import build_srcset
 from .models import PageImage, SiteSetting
 
 
 class PageImageSerializer(serializers.ModelSerializer):
+    image_srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = PageImage
-        fields = ['id', 'name', 'position', 'image', 'link_url', 'is_active', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'position', 'image', 'image_srcset', 'link_url', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+    def get_image_srcset(self, obj):
+        return build_srcset(obj.image_variants, obj.image.storage, self.context.get('request'))
+
 
 class SiteSettingSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from jobs.queue import enqueue
+from metadent_backend.caching import invalidate_models
+from metadent_backend.images import variants_outdated
+from .models import PageImage, SiteSetting
+
+
+@receiver([post_save, post_delete], sender=PageImage)
+@receiver([post_save, post_delete], sender=SiteSetting)
+def invalidate_cms_cache(sender, **kwargs):
+    invalidate_models(sender)
+
+
+@receiver(post_save, sender=PageImage)
+def generate_page_image_variants(sender, instance, raw=False, **kwargs):
+    if not raw and variants_outdated(instance):
+        enqueue('metadent_backend.images.generate_variants_task', model='cms.PageImage', pk=instance.pk)
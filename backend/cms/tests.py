@@ -1,3 +1,193 @@
-from django.test import TestCase
+import gzip
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from metadent_backend import compression
+from metadent_backend.caching import response_cache
+from .models import PageImage, SiteSetting
+
+
+def make_page_image(position='hero', is_active=True, name='Slide'):
+    return PageImage.objects.create(
+        name=name, position=position, image='page_images/test.png', is_active=is_active
+    )
+
+
+class CmsBootstrapTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        response_cache.clear()
+        SiteSetting.objects.create(key='company_name', value='Metadent', category='company')
+        make_page_image('hero', name='Slide 1')
+        make_page_image('hero', name='Slide 2')
+        make_page_image('story_section', is_active=False)
+
+    def test_payload_shape(self):
+        response = self.client.get(reverse('cms-bootstrap'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['settings'], {'company_name': 'Metadent'})
+        self.assertEqual(list(response.data['page_images']), ['hero'])
+        self.assertEqual(len(response.data['page_images']['hero']), 2)
+
+    def test_served_from_cache_until_change(self):
+        self.client.get(reverse('cms-bootstrap'))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('cms-bootstrap'))['X-Cache'], 'HIT')
+
+        SiteSetting.objects.filter(key='company_name').get().delete()
+        make_page_image('story_section')
+        response = self.client.get(reverse('cms-bootstrap'))
+        self.assertEqual(response.data['settings'], {})
+        self.assertIn('story_section', response.data['page_images'])
+
+
+class PageImageFilterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        make_page_image('hero', name='Slide 1')
+        make_page_image('hero', is_active=False, name='Slide cũ')
+        make_page_image('tamnuoc_banner')
+
+    def test_filter_by_position_and_active(self):
+        response = self.client.get(reverse('page-image-list'), {'position': 'hero', 'is_active': 'true'})
+        self.assertEqual([img['name'] for img in response.data], ['Slide 1'])
+
+    def test_filter_inactive(self):
+        response = self.client.get(reverse('page-image-list'), {'is_active': 'false'})
+        self.assertEqual([img['name'] for img in response.data], ['Slide cũ'])
+
+    def test_unfiltered_returns_all(self):
+        self.assertEqual(len(self.client.get(reverse('page-image-list')).data), 3)
+
+
+class SiteSettingConditionalGetTests(TestCase):
+    def test_settings_revalidate_after_update(self):
+        client = APIClient()
+        setting = SiteSetting.objects.create(key='contact_phone', value='19001234', category='contact')
+        url = reverse('setting-list')
+        etag = client.get(url)['ETag']
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        setting.value = '19005678'
+        setting.save()
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class CmsResponseCacheTests(TestCase):
+    def setUp(self):
+        response_cache.clear()
+        self.client = APIClient()
+        self.setting = SiteSetting.objects.create(key='hotline', value='19001234', category='contact')
+        PageImage.objects.create(name='Slide 1', position='hero', is_active=True)
+
+    def test_tags_are_per_model(self):
+        settings_url, images_url = reverse('setting-list'), reverse('page-image-list')
+        self.client.get(settings_url)
+        self.client.get(images_url)
+
+        self.setting.value = '19005678'
+        self.setting.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(images_url)['X-Cache'], 'HIT')
+        response = self.client.get(settings_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()[0]['value'], '19005678')
+
+        self.setting.delete()
+        self.assertEqual(self.client.get(settings_url).json(), [])
+
+
+class CmsStatsCommandTests(TestCase):
+    def setUp(self):
+        make_page_image('hero')
+        make_page_image('hero', is_active=False)
+        make_page_image('story_section', is_active=False)
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        (Path(self.media_root) / 'products').mkdir()
+        (Path(self.media_root) / 'products' / 'a.jpg').write_bytes(b'x' * 100)
+
+    def test_json_report_uses_one_query_per_section(self):
+        out = StringIO()
+        with override_settings(MEDIA_ROOT=self.media_root), self.assertNumQueries(3):
+            call_command('cms_stats', '--json', stdout=out)
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(report['page_images']['positions']['hero'], {'active': 1, 'inactive': 1})
+        self.assertEqual(report['page_images']['positions']['ourteam_section'], {'active': 0, 'inactive': 0})
+        self.assertEqual(report['page_images']['inactive'], 2)
+        self.assertEqual(report['products']['total'], 0)
+        self.assertEqual(report['orders']['statuses']['pending']['count'], 0)
+        self.assertEqual(report['media']['directories']['products'], {'files': 1, 'bytes': 100})
+        self.assertEqual(set(report['timings_ms']), {'page_images', 'products', 'orders', 'media'})
+
+    def test_text_report(self):
+        out = StringIO()
+        with override_settings(MEDIA_ROOT=self.media_root):
+            call_command('cms_stats', stdout=out)
+        self.assertIn('hero                 - Active: 1/2', out.getvalue())
+        self.assertIn('Total: 1 files, 100 B', out.getvalue())
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for i in range(20):
+            SiteSetting.objects.create(key=f'key_{i}', value='Chuyên cung cấp sản phẩm chăm sóc răng miệng', category='company')
+
+    def get(self, encoding):
+        return self.client.get(reverse('setting-list'), HTTP_ACCEPT_ENCODING=encoding)
+
+    def test_gzip_and_precompressed_cache(self):
+        plain = self.client.get(reverse('setting-list')).content
+        with mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            first = self.get('gzip, deflate')
+            second = self.get('gzip;q=1.0, identity;q=0.5')
+        self.assertEqual(first['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', first['Vary'])
+        self.assertTrue(first['ETag'].startswith('W/"'))
+        self.assertEqual(gzip.decompress(first.content), plain)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(compress.call_count, 1)
+
+        # Nội dung đổi -> phiên bản mới, không trả bản nén cũ
+        setting = SiteSetting.objects.get(key='key_0')
+        setting.value = 'Giá trị mới'
+        setting.save()
+        changed = self.get('gzip')
+        self.assertIn('Giá trị mới', gzip.decompress(changed.content).decode())
+
+    def test_not_acceptable_or_small(self):
+        self.assertFalse(self.get('gzip;q=0').has_header('Content-Encoding'))
+        self.assertFalse(self.client.get(reverse('setting-list')).has_header('Content-Encoding'))
+        small = self.client.get(reverse('setting-detail', args=[SiteSetting.objects.first().pk]),
+                                HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+
+    def test_conditional_get_still_matches_weak_etag(self):
+        etag = self.get('gzip')['ETag']
+        response = self.client.get(reverse('setting-list'), HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    @skipUnless(compression.brotli, 'brotli is not installed')
+    def test_brotli_preferred(self):
+        response = self.get('gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.content),
+                         self.client.get(reverse('setting-list')).content)
+
+    def test_choose_encoding(self):
+        self.assertEqual(compression.choose_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(compression.choose_encoding('*'), 'br' if compression.brotli else 'gzip')
+        self.assertEqual(compression.choose_encoding('br, gzip', streaming=True), 'gzip')
+        self.assertIsNone(compression.choose_encoding('identity'))
+        self.assertIsNone(compression.choose_encoding(''))
@@ -9,5 +9,8 @@ urlpatterns = [
     # Site Settings
     path('settings/', views.SiteSettingListAPIView.as_view(), name='setting-list'),
     path('settings/<int:pk>/', views.SiteSettingDetailAPIView.as_view(), name='setting-detail'),
+    
+    # Settings + page images gộp cho frontend
+    path('bootstrap/', views.cms_bootstrap, name='cms-bootstrap'),
 ]
 
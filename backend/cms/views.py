@@ -3,23 +3,59 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from .models import PageImage, SiteSetting
 from .serializers import PageImageSerializer, SiteSettingSerializer
+from metadent_backend.caching import CacheResponseMixin, cache_response
+from metadent_backend.conditional import ConditionalGetMixin
 
 
-class PageImageListAPIView(generics.ListCreateAPIView):
+class PageImageListAPIView(CacheResponseMixin, ConditionalGetMixin, generics.ListCreateAPIView):
+    """
+    List page images, filterable by ?position= and ?is_active=
+    """
+    cache_tags = (PageImage,)
     queryset = PageImage.objects.all()
     serializer_class = PageImageSerializer
 
+    def get_queryset(self):
+        queryset = PageImage.objects.all()
+        position = self.request.query_params.get('position', None)
+        if position:
+            queryset = queryset.filter(position=position)
+        is_active = self.request.query_params.get('is_active', None)
+        if is_active is not None:
+            queryset = queryset.filter(is_active=is_active.lower() in ('1', 'true', 'yes'))
+        return queryset
 
-class PageImageDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+
+class PageImageDetailAPIView(CacheResponseMixin, ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
+    cache_tags = (PageImage,)
     queryset = PageImage.objects.all()
     serializer_class = PageImageSerializer
 
 
-class SiteSettingListAPIView(generics.ListCreateAPIView):
+class SiteSettingListAPIView(CacheResponseMixin, ConditionalGetMixin, generics.ListCreateAPIView):
+    cache_tags = (SiteSetting,)
     queryset = SiteSetting.objects.all()
     serializer_class = SiteSettingSerializer
 
 
-class SiteSettingDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class SiteSettingDetailAPIView(CacheResponseMixin, ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
+    cache_tags = (SiteSetting,)
     queryset = SiteSetting.objects.all()
     serializer_class = SiteSettingSerializer
+
+
+def build_bootstrap_payload():
+    settings_map = dict(SiteSetting.objects.values_list('key', 'value'))
+    page_images = {}
+    for image in PageImage.objects.filter(is_active=True):
+        page_images.setdefault(image.position, []).append(PageImageSerializer(image).data)
+    return {'settings': settings_map, 'page_images': page_images}
+
+
+@cache_response((PageImage, SiteSetting))
+@api_view(['GET'])
+def cms_bootstrap(request):
+    """
+    Toàn bộ settings (key -> value) và PageImage đang kích hoạt theo vị trí trong một response
+    """
+    return Response(build_bootstrap_payload())
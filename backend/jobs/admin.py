@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'task', 'status', 'attempts', 'max_attempts', 'run_after', 'created_at']
+    list_filter = ['status', 'task']
+    search_fields = ['task', 'last_error']
+    readonly_fields = ['created_at', 'updated_at', 'locked_at']
+    actions = ['retry_jobs']
+
+    def retry_jobs(self, request, queryset):
+        from django.utils import timezone
+        updated = queryset.update(status='pending', attempts=0, run_after=timezone.now(), locked_at=None)
+        self.message_user(request, f'Đã đưa {updated} công việc vào hàng đợi')
+    retry_jobs.short_description = 'Chạy lại các công việc đã chọn'
@@ -0,0 +1,56 @@
+"""
+Worker xử lý hàng đợi công việc nền bằng thread pool
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.queue import claim, requeue_stale, run_job
+
+
+def _run_in_thread(job):
+    close_old_connections()
+    try:
+        return run_job(job)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Run the background job worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4, help='Number of worker threads')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is drained')
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        poll_interval = options['poll_interval']
+        self.stdout.write(f'Job worker started with {threads} threads')
+
+        in_flight = set()
+        processed = 0
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='job') as executor:
+            try:
+                while True:
+                    in_flight = {future for future in in_flight if not future.done()}
+                    free = threads - len(in_flight)
+                    jobs = claim(free) if free > 0 else []
+                    for job in jobs:
+                        in_flight.add(executor.submit(_run_in_thread, job))
+                        processed += 1
+
+                    if not jobs and not in_flight:
+                        if options['once']:
+                            break
+                        requeue_stale()
+                        time.sleep(poll_interval)
+                    elif not jobs:
+                        time.sleep(0.05)
+            except KeyboardInterrupt:
+                self.stdout.write('Stopping, waiting for running jobs...')
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} jobs'))
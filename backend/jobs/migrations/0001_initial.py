@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:07
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=200, verbose_name='Task (dotted path)')),
+                ('kwargs', models.JSONField(blank=True, default=dict, verbose_name='Tham số')),
+                ('status', models.CharField(choices=[('pending', 'Chờ xử lý'), ('running', 'Đang chạy'), ('failed', 'Thất bại')], default='pending', max_length=20, verbose_name='Trạng thái')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Số lần chạy')),
+                ('max_attempts', models.PositiveIntegerField(default=5, verbose_name='Số lần tối đa')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Chạy sau')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Bắt đầu chạy lúc')),
+                ('last_error', models.TextField(blank=True, verbose_name='Lỗi gần nhất')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Công việc nền',
+                'verbose_name_plural': 'Công việc nền',
+                'ordering': ['run_after', 'id'],
+                'indexes': [models.Index(fields=['status', 'run_after', 'id'], name='job_status_run_after_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Công việc chạy nền (resize ảnh, xóa file...) được worker `run_jobs` xử lý
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Chờ xử lý'),
+        ('running', 'Đang chạy'),
+        ('failed', 'Thất bại'),
+    ]
+
+    task = models.CharField(max_length=200, verbose_name="Task (dotted path)")
+    kwargs = models.JSONField(default=dict, blank=True, verbose_name="Tham số")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="Trạng thái")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Số lần chạy")
+    max_attempts = models.PositiveIntegerField(default=5, verbose_name="Số lần tối đa")
+    run_after = models.DateTimeField(default=timezone.now, verbose_name="Chạy sau")
+    locked_at = models.DateTimeField(blank=True, null=True, verbose_name="Bắt đầu chạy lúc")
+    last_error = models.TextField(blank=True, verbose_name="Lỗi gần nhất")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Công việc nền"
+        verbose_name_plural = "Công việc nền"
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after', 'id'], name='job_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.task} ({self.status})"
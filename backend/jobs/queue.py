@@ -0,0 +1,90 @@
+"""
+Hàng đợi công việc nền lưu trong database.
+
+    enqueue('metadent_backend.images.generate_variants_task', model='products.Product', pk=1)
+
+Task là một hàm nhận kwargs JSON; worker (`manage.py run_jobs`) claim job bằng
+UPDATE có điều kiện nên nhiều worker có thể chạy song song an toàn.
+Job thành công bị xóa, job lỗi được thử lại với backoff tăng dần.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+STALE_AFTER = timedelta(minutes=10)
+MAX_BACKOFF_SECONDS = 3600
+
+
+def enqueue(task, max_attempts=5, delay=None, **kwargs):
+    run_after = timezone.now() + delay if delay else timezone.now()
+    return Job.objects.create(task=task, kwargs=kwargs, max_attempts=max_attempts, run_after=run_after)
+
+
+def requeue_stale(now=None):
+    """Đưa lại job 'running' của worker đã chết về trạng thái pending"""
+    now = now or timezone.now()
+    return Job.objects.filter(status='running', locked_at__lt=now - STALE_AFTER).update(
+        status='pending', locked_at=None
+    )
+
+
+def claim(limit):
+    now = timezone.now()
+    candidates = list(
+        Job.objects.filter(status='pending', run_after__lte=now)
+        .order_by('run_after', 'id')
+        .values_list('id', flat=True)[:limit]
+    )
+    claimed = []
+    for job_id in candidates:
+        updated = Job.objects.filter(id=job_id, status='pending').update(
+            status='running', locked_at=now, attempts=F('attempts') + 1
+        )
+        if updated:
+            claimed.append(job_id)
+    return list(Job.objects.filter(id__in=claimed))
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(2 ** attempts, MAX_BACKOFF_SECONDS))
+
+
+def run_job(job):
+    try:
+        import_string(job.task)(**job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            logger.error('Job #%s %s failed permanently:\n%s', job.id, job.task, error)
+            Job.objects.filter(id=job.id).update(status='failed', locked_at=None, last_error=error)
+        else:
+            logger.warning('Job #%s %s failed (attempt %s), retrying', job.id, job.task, job.attempts)
+            Job.objects.filter(id=job.id).update(
+                status='pending', locked_at=None, last_error=error,
+                run_after=timezone.now() + backoff(job.attempts)
+            )
+        return False
+    else:
+        Job.objects.filter(id=job.id).delete()
+        return True
+
+
+def run_pending(limit=100):
+    """Chạy tuần tự mọi job đến hạn trong process hiện tại (dùng cho test và --once)"""
+    processed = 0
+    while processed < limit:
+        jobs = claim(min(10, limit - processed))
+        if not jobs:
+            break
+        for job in jobs:
+            run_job(job)
+            processed += 1
+    return processed
@@ -0,0 +1,44 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from .models import Job
+from .queue import claim, enqueue, run_pending
+
+CALLS = []
+
+
+def record_task(value):
+    CALLS.append(value)
+
+
+def failing_task():
+    raise RuntimeError('boom')
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_successful_job_runs_once_and_is_removed(self):
+        enqueue('jobs.tests.record_task', value=42)
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(CALLS, [42])
+        self.assertFalse(Job.objects.exists())
+
+    def test_claimed_job_is_not_claimed_twice(self):
+        enqueue('jobs.tests.record_task', value=1)
+        self.assertEqual(len(claim(5)), 1)
+        self.assertEqual(claim(5), [])
+
+    def test_failed_job_is_retried_with_backoff_then_marked_failed(self):
+        job = enqueue('jobs.tests.failing_task', max_attempts=2)
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('pending', 1))
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIn('boom', job.last_error)
+
+        Job.objects.filter(id=job.id).update(run_after=timezone.now())
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
@@ -0,0 +1,224 @@
+"""
+Benchmark API chạy qua URLconf và middleware thật bằng django.test.Client.
+
+Mỗi kịch bản được chạy tuần tự `requests` lần (sau vài request khởi động),
+ghi lại latency từng request và số query (qua connection.execute_wrapper).
+Kết quả gồm p50/p95/p99 (ms), số query trung bình/tối đa và req/s; có thể
+so sánh với baseline đã lưu (loadtest/baseline.json):
+
+- số query tối đa tăng so với baseline luôn là regression (không phụ thuộc máy);
+- p95 tăng hoặc req/s giảm quá `tolerance` (mặc định 50%) là regression.
+
+Kịch bản đọc đi qua response cache được đo hai lần: `<tên>` (phần lớn trúng
+cache) và `<tên>_uncached` (xóa cache trước mỗi request, đo đường tính lại
+gồm query, serialize và ghi cache), để regression trên đường không cache vẫn
+bị phát hiện. Benchmark dùng cache riêng (ISOLATED_CACHES), không đọc hay xóa
+cache dùng chung của server dev.
+"""
+import json
+import math
+import random
+import time
+from pathlib import Path
+
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from metadent_backend.caching import response_cache
+from .seed import BENCH_PASSWORD, BENCH_USERNAME, CUSTOMER
+
+BASELINE_FILE = Path(__file__).resolve().parent / 'baseline.json'
+DEFAULT_TOLERANCE = 0.5
+UNCACHED_SUFFIX = '_uncached'
+ISOLATED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'loadtest',
+    }
+}
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Scenario:
+    """
+    `weight` thu nhỏ số request cho kịch bản đắt (login băm mật khẩu PBKDF2);
+    `cached`: view đi qua response cache, đo thêm kịch bản `<tên>_uncached`
+    """
+
+    def __init__(self, name, request, weight=1.0, expected_status=200, cached=False):
+        self.name = name
+        self.request = request
+        self.weight = weight
+        self.expected_status = expected_status
+        self.cached = cached
+
+
+def _product_list(client, context):
+    return client.get(reverse('product-list'), {'cursor': '', 'page_size': 20})
+
+
+def _category_list(client, context):
+    return client.get(reverse('products-by-category', args=[context['rng'].choice(context['categories'])]))
+
+
+def _create_order(client, context):
+    product_ids = context['rng'].sample(context['product_ids'], min(3, len(context['product_ids'])))
+    return client.post(reverse('create-order'), {
+        'cart_items': [{'product_id': product_id, 'quantity': 1} for product_id in product_ids],
+        'customer': CUSTOMER,
+    }, content_type='application/json')
+
+
+def _order_list(client, context):
+    return client.get(reverse('order-list'), {'cursor': '', 'view': 'summary'})
+
+
+def _cms_bootstrap(client, context):
+    return client.get(reverse('cms-bootstrap'))
+
+
+def _cms_page_images(client, context):
+    return client.get(reverse('page-image-list'), {'is_active': 'true'})
+
+
+def _login(client, context):
+    return client.post(reverse('login'), {'username': BENCH_USERNAME, 'password': BENCH_PASSWORD},
+                       content_type='application/json')
+
+
+SCENARIOS = [
+    Scenario('product_list', _product_list, cached=True),
+    Scenario('category_list', _category_list, cached=True),
+    Scenario('create_order', _create_order, expected_status=201),
+    Scenario('order_list', _order_list),
+    Scenario('cms_bootstrap', _cms_bootstrap, cached=True),
+    Scenario('cms_page_images', _cms_page_images, cached=True),
+    Scenario('login', _login, weight=0.1),
+]
+
+
+def percentile(sorted_values, fraction):
+    """Percentile theo nearest-rank trên danh sách đã sắp xếp"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(round(fraction * len(sorted_values), 9))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def run_scenario(scenario, context, requests, warmup=5, uncached=False):
+    """uncached=True: xóa response cache trước mỗi request (không tính vào latency)"""
+    client = Client()
+    counter = QueryCounter()
+    latencies = []
+    queries = []
+    total = max(1, int(requests * scenario.weight))
+
+    for _ in range(min(warmup, total)):
+        scenario.request(client, context)
+
+    elapsed = 0.0
+    with connection.execute_wrapper(counter):
+        for _ in range(total):
+            if uncached:
+                response_cache.clear()
+            before = counter.count
+            request_started = time.perf_counter()
+            response = scenario.request(client, context)
+            latencies.append(time.perf_counter() - request_started)
+            elapsed += latencies[-1]
+            queries.append(counter.count - before)
+            if response.status_code != scenario.expected_status:
+                raise AssertionError(
+                    f'{scenario.name}: expected HTTP {scenario.expected_status}, got {response.status_code}'
+                )
+
+    latencies.sort()
+    return {
+        'requests': total,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'queries_avg': round(sum(queries) / len(queries), 2),
+        'queries_max': max(queries),
+        'rps': round(total / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def run_benchmark(products, requests, warmup=5, only=None, seed_value=0):
+    """Chạy các kịch bản trên dữ liệu đã seed; `products` là danh sách Product"""
+    context = {
+        'rng': random.Random(seed_value),
+        'product_ids': [product.pk for product in products],
+        'categories': sorted({product.category for product in products}),
+    }
+    results = {}
+    for scenario in SCENARIOS:
+        if only and scenario.name not in only:
+            continue
+        results[scenario.name] = run_scenario(scenario, context, requests, warmup)
+        if scenario.cached:
+            results[scenario.name + UNCACHED_SUFFIX] = run_scenario(
+                scenario, context, requests, warmup, uncached=True
+            )
+    return results
+
+
+def compare_renderers(data, renderers, rounds=20):
+    """
+    Thời gian render trung bình (ms) của từng renderer trên cùng `data`;
+    báo lỗi nếu các renderer cho output khác nhau
+    """
+    outputs = {name: renderer.render(data) for name, renderer in renderers.items()}
+    reference_name, reference = next(iter(outputs.items()))
+    for name, output in outputs.items():
+        if output != reference:
+            raise AssertionError(f'{name} output differs from {reference_name}')
+
+    results = {}
+    for name, renderer in renderers.items():
+        started = time.perf_counter()
+        for _ in range(rounds):
+            renderer.render(data)
+        results[name] = {
+            'ms': round((time.perf_counter() - started) * 1000 / rounds, 2),
+            'bytes': len(outputs[name]),
+        }
+    return results
+
+
+def load_baseline(path=BASELINE_FILE):
+    path = Path(path)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def save_baseline(config, results, path=BASELINE_FILE):
+    Path(path).write_text(
+        json.dumps({'config': config, 'scenarios': results}, indent=2, sort_keys=True) + '\n', encoding='utf-8'
+    )
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Danh sách regression (chuỗi mô tả) so với baseline"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        if current['queries_max'] > previous['queries_max']:
+            regressions.append(f"{name}: queries/request {previous['queries_max']} -> {current['queries_max']}")
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current['rps'] < previous['rps'] / (1 + tolerance):
+            regressions.append(f"{name}: req/s {previous['rps']} -> {current['rps']}")
+    return regressions
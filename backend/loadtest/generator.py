@@ -0,0 +1,192 @@
+"""
+Sinh dữ liệu giả lập quy mô lớn (sản phẩm, đơn hàng, chi tiết đơn hàng) với
+tên và địa chỉ tiếng Việt.
+
+Mọi giá trị đều lấy từ một random.Random(seed) duy nhất và mốc thời gian
+`end` truyền vào, nên cùng seed + cùng `end` cho ra cùng dữ liệu. Dữ liệu được
+ghi theo lô bằng bulk_create, mỗi lô một transaction, nên bộ nhớ chỉ phụ thuộc
+kích thước lô (trừ danh sách (id, giá) của sản phẩm để chọn cho đơn hàng).
+"""
+import contextlib
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+
+from cart.models import Order, OrderItem
+from metadent_backend.text import fold
+from products.models import Product
+
+FAMILY_NAMES = [
+    ('Nguyễn', 38), ('Trần', 11), ('Lê', 9), ('Phạm', 7), ('Hoàng', 5), ('Huỳnh', 5), ('Phan', 4),
+    ('Vũ', 4), ('Võ', 4), ('Đặng', 2), ('Bùi', 2), ('Đỗ', 2), ('Hồ', 2), ('Ngô', 2), ('Dương', 1), ('Lý', 1),
+]
+MIDDLE_NAMES = {
+    'male': ['Văn', 'Hữu', 'Đức', 'Minh', 'Quang', 'Thành', 'Công', 'Gia'],
+    'female': ['Thị', 'Ngọc', 'Thu', 'Thanh', 'Kim', 'Mỹ', 'Bảo', 'Khánh'],
+}
+GIVEN_NAMES = {
+    'male': ['An', 'Bình', 'Cường', 'Dũng', 'Hải', 'Hùng', 'Khoa', 'Long', 'Nam', 'Phúc', 'Quân', 'Sơn',
+             'Tài', 'Thắng', 'Trung', 'Tuấn', 'Việt', 'Vinh'],
+    'female': ['Anh', 'Chi', 'Dung', 'Giang', 'Hà', 'Hạnh', 'Hoa', 'Hương', 'Lan', 'Linh', 'Mai', 'Ngân',
+               'Nhung', 'Phương', 'Quỳnh', 'Thảo', 'Trang', 'Vy', 'Yến'],
+}
+STREETS = [
+    'Nguyễn Huệ', 'Lê Lợi', 'Trần Hưng Đạo', 'Hai Bà Trưng', 'Lý Thường Kiệt', 'Nguyễn Trãi', 'Điện Biên Phủ',
+    'Cách Mạng Tháng Tám', 'Võ Văn Tần', 'Pasteur', 'Nguyễn Thị Minh Khai', 'Phan Đình Phùng', 'Lê Duẩn',
+    'Hoàng Văn Thụ', 'Nguyễn Văn Linh', 'Trường Chinh', 'Quang Trung', 'Bạch Đằng', 'Nguyễn Hữu Cảnh',
+]
+# (tỉnh/thành, trọng số, quận/huyện)
+CITIES = [
+    ('TP. Hồ Chí Minh', 35, ['Quận 1', 'Quận 3', 'Quận 7', 'Quận 10', 'Bình Thạnh', 'Phú Nhuận', 'Gò Vấp',
+                             'Tân Bình', 'Thủ Đức']),
+    ('Hà Nội', 30, ['Ba Đình', 'Hoàn Kiếm', 'Đống Đa', 'Cầu Giấy', 'Hai Bà Trưng', 'Thanh Xuân', 'Tây Hồ',
+                    'Long Biên']),
+    ('Đà Nẵng', 8, ['Hải Châu', 'Thanh Khê', 'Sơn Trà', 'Ngũ Hành Sơn', 'Liên Chiểu']),
+    ('Hải Phòng', 6, ['Hồng Bàng', 'Lê Chân', 'Ngô Quyền', 'Hải An']),
+    ('Cần Thơ', 5, ['Ninh Kiều', 'Cái Răng', 'Bình Thủy']),
+    ('Bình Dương', 5, ['Thủ Dầu Một', 'Dĩ An', 'Thuận An']),
+    ('Đồng Nai', 5, ['Biên Hòa', 'Long Khánh', 'Nhơn Trạch']),
+    ('Khánh Hòa', 3, ['Nha Trang', 'Cam Ranh']),
+    ('Thừa Thiên Huế', 3, ['Huế', 'Hương Thủy']),
+]
+PHONE_PREFIXES = ['090', '091', '093', '094', '096', '097', '098', '032', '033', '034', '035', '036', '037',
+                  '038', '039', '070', '076', '077', '078', '079', '081', '082', '083', '084', '085', '088']
+EMAIL_DOMAINS = ['gmail.com', 'gmail.com', 'gmail.com', 'yahoo.com', 'outlook.com', 'icloud.com']
+
+PRODUCT_LINES = {
+    'water_flosser': (['Máy tăm nước'], ['Waterpik', 'Panasonic', 'Philips', 'Oral-B', 'Lock&Lock', 'Halio'],
+                      (490, 3500)),
+    'electric_brush': (['Bàn chải điện', 'Bàn chải điện sóng âm'], ['Oral-B', 'Philips Sonicare', 'Xiaomi',
+                                                                     'Panasonic', 'Halio'], (350, 4500)),
+    'mouthwash': (['Nước súc miệng'], ['Listerine', 'Colgate', 'P/S', 'Kin', 'Thái Dương', 'Dr. Muối'],
+                  (35, 250)),
+    'other': (['Chỉ nha khoa', 'Kem đánh răng', 'Bàn chải kẽ', 'Đầu bàn chải thay thế'],
+              ['Oral-B', 'Colgate', 'Sensodyne', 'Curaprox', 'P/S'], (25, 400)),
+}
+PRODUCT_SUFFIXES = ['Pro', 'Plus', 'Mini', 'Travel', 'Ultra', 'Care', 'Fresh', 'Sensitive', 'Kids']
+
+ORDER_STATUSES = [('delivered', 60), ('shipped', 10), ('processing', 10), ('pending', 15), ('cancelled', 5)]
+
+
+def _weighted(rng, pairs):
+    values, weights = zip(*pairs)
+    return rng.choices(values, weights)[0]
+
+
+def vietnamese_name(rng):
+    gender = rng.choice(('male', 'female'))
+    return ' '.join((
+        _weighted(rng, FAMILY_NAMES), rng.choice(MIDDLE_NAMES[gender]), rng.choice(GIVEN_NAMES[gender])
+    ))
+
+
+def vietnamese_address(rng):
+    city, _weight, districts = rng.choices(CITIES, [weight for _c, weight, _d in CITIES])[0]
+    number = rng.randint(1, 450)
+    if rng.random() < 0.3:
+        number = f'{number}/{rng.randint(1, 60)}'
+    return f'{number} {rng.choice(STREETS)}, Phường {rng.randint(1, 20)}, {rng.choice(districts)}, {city}'
+
+
+def customer(rng, index):
+    name = vietnamese_name(rng)
+    handle = '.'.join(reversed(fold(name).lower().split()[::2]))
+    return {
+        'customer_name': name,
+        'customer_email': f'{handle}{index}@{rng.choice(EMAIL_DOMAINS)}',
+        'customer_phone': rng.choice(PHONE_PREFIXES) + f'{rng.randrange(10 ** 7):07d}',
+        'customer_address': vietnamese_address(rng),
+    }
+
+
+def product(rng, index, created_at):
+    category = rng.choice(list(PRODUCT_LINES))
+    kinds, brands, (low, high) = PRODUCT_LINES[category]
+    kind, brand = rng.choice(kinds), rng.choice(brands)
+    name = f'{kind} {brand} {rng.choice(PRODUCT_SUFFIXES)} {100 + index % 900}'
+    return Product(
+        name=name,
+        description=f'{name} chính hãng, bảo hành 12 tháng. Phù hợp cho cả gia đình, giao hàng toàn quốc.',
+        price=Decimal(rng.randrange(low, high) * 1000),
+        image='',
+        category=category,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+@contextlib.contextmanager
+def explicit_timestamps(*models):
+    """Tắt auto_now/auto_now_add để bulk_create giữ created_at/updated_at đã sinh"""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _batches(total, batch_size):
+    start = 0
+    while start < total:
+        size = min(batch_size, total - start)
+        yield start, size
+        start += size
+
+
+def generate_products(count, rng, end, days=365, batch_size=5000, progress=None):
+    """Trả về danh sách (id, price) của các sản phẩm đã tạo"""
+    created = []
+    with explicit_timestamps(Product):
+        for start, size in _batches(count, batch_size):
+            batch = [
+                product(rng, start + i, end - timedelta(seconds=rng.randrange(days * 86400)))
+                for i in range(size)
+            ]
+            with transaction.atomic():
+                Product.objects.bulk_create(batch)
+            created.extend((item.pk, item.price) for item in batch)
+            if progress:
+                progress(start + size)
+    return created
+
+
+def generate_orders(count, products, rng, end, days=365, max_items=5, batch_size=5000, progress=None):
+    """Tạo `count` đơn hàng (1..max_items sản phẩm mỗi đơn); trả về số OrderItem đã tạo"""
+    item_count = 0
+    with explicit_timestamps(Order):
+        for start, size in _batches(count, batch_size):
+            orders, lines = [], []
+            for i in range(size):
+                created_at = end - timedelta(seconds=rng.randrange(days * 86400))
+                picked = rng.sample(products, min(rng.randint(1, max_items), len(products)))
+                quantities = [rng.choices((1, 2, 3, 4), (70, 20, 7, 3))[0] for _ in picked]
+                total = sum(price * quantity for (_pk, price), quantity in zip(picked, quantities))
+                status = _weighted(rng, ORDER_STATUSES)
+                updated_at = created_at if status == 'pending' else min(
+                    end, created_at + timedelta(hours=rng.randint(1, 96))
+                )
+                orders.append(Order(
+                    total_amount=total, status=status, created_at=created_at, updated_at=updated_at,
+                    **customer(rng, start + i)
+                ))
+                lines.append(list(zip(picked, quantities)))
+
+            with transaction.atomic():
+                Order.objects.bulk_create(orders)
+                items = [
+                    OrderItem(order_id=order.pk, product_id=product_id, quantity=quantity, price=price)
+                    for order, order_lines in zip(orders, lines)
+                    for (product_id, price), quantity in order_lines
+                ]
+                OrderItem.objects.bulk_create(items, batch_size=batch_size)
+            item_count += len(items)
+            if progress:
+                progress(start + size)
+    return item_count
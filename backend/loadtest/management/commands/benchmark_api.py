@@ -0,0 +1,90 @@
+"""
+Benchmark API trên một database test và cache riêng (không đụng tới dữ liệu
+hay cache của server dev)
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from loadtest.benchmark import (
+    BASELINE_FILE, DEFAULT_TOLERANCE, ISOLATED_CACHES, SCENARIOS, compare, load_baseline, run_benchmark,
+    save_baseline,
+)
+from loadtest.seed import seed
+from metadent_backend.caching import response_cache
+
+
+class Command(BaseCommand):
+    help = 'Seed a throwaway database, benchmark the main API endpoints and compare against the stored baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=200, help='Number of products to seed')
+        parser.add_argument('--orders', type=int, default=500, help='Number of orders to seed')
+        parser.add_argument('--site-settings', type=int, default=30, help='Number of site settings to seed')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Warm-up requests per scenario')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for data and requests')
+        parser.add_argument(
+            '--scenario', action='append', choices=[scenario.name for scenario in SCENARIOS],
+            help='Only run this scenario (repeatable)'
+        )
+        parser.add_argument('--baseline', default=str(BASELINE_FILE), help='Baseline JSON file')
+        parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help='Allowed relative p95 / req/s regression (0.5 = 50%%)')
+        parser.add_argument('--update-baseline', action='store_true', help='Store these results as the new baseline')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        config = {key: options[key] for key in ('products', 'orders', 'site_settings', 'requests', 'seed')}
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(CACHES=ISOLATED_CACHES):
+                products = seed(options['products'], options['orders'], options['site_settings'], options['seed'])
+                # Bắt đầu từ cache rỗng (LRU trong process và tag đã nhớ)
+                response_cache.clear()
+                results = run_benchmark(
+                    products, options['requests'], options['warmup'], options['scenario'], options['seed']
+                )
+                response_cache.clear()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options['json']:
+            self.stdout.write(json.dumps({'config': config, 'scenarios': results}, indent=2))
+        else:
+            self._print_table(results)
+
+        if options['update_baseline']:
+            save_baseline(config, results, options['baseline'])
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+
+        baseline = load_baseline(options['baseline'])
+        if baseline is None:
+            self.stdout.write(self.style.WARNING('No baseline found; run with --update-baseline to create one'))
+            return
+        if baseline.get('config') != config:
+            self.stdout.write(self.style.WARNING(
+                f"Baseline was recorded with {baseline.get('config')}; timings may not be comparable"
+            ))
+        regressions = compare(results, baseline, options['tolerance'])
+        if regressions:
+            raise CommandError('Performance regressions:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
+
+    def _print_table(self, results):
+        header = f"{'scenario':26s} {'reqs':>6s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} " \
+                 f"{'q/req':>7s} {'q max':>6s} {'req/s':>8s}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, r in results.items():
+            self.stdout.write(
+                f"{name:26s} {r['requests']:6d} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['p99_ms']:9.2f} "
+                f"{r['queries_avg']:7.2f} {r['queries_max']:6d} {r['rps']:8.1f}"
+            )
@@ -0,0 +1,71 @@
+"""
+So sánh JSONRenderer của DRF với FastJSONRenderer trên listing lớn
+"""
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from cart.models import Order
+from cart.serializers import OrderSerializer
+from cart.views import ORDER_ITEMS_PREFETCH
+from loadtest.benchmark import compare_renderers
+from loadtest.generator import generate_orders, generate_products
+from metadent_backend.images import variant_name
+from metadent_backend.renderers import FastJSONRenderer, orjson
+from products.models import Product
+from products.serializers import ProductSerializer
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the stock DRF JSONRenderer against FastJSONRenderer on large product and order listings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=2000, help='Products in the listing')
+        parser.add_argument('--orders', type=int, default=1000, help='Orders in the listing')
+        parser.add_argument('--rounds', type=int, default=20, help='Renders per renderer')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed: FastJSONRenderer falls back to JSONRenderer'))
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            listings = self._listings(options['products'], options['orders'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        renderers = {'drf': JSONRenderer(), 'fast': FastJSONRenderer()}
+        self.stdout.write(f"{'listing':10s} {'rows':>7s} {'bytes':>10s} {'drf ms':>9s} {'fast ms':>9s} {'speedup':>8s}")
+        for name, data in listings.items():
+            results = compare_renderers(data, renderers, options['rounds'])
+            drf, fast = results['drf'], results['fast']
+            speedup = drf['ms'] / fast['ms'] if fast['ms'] else 0
+            self.stdout.write(
+                f"{name:10s} {len(data):7d} {drf['bytes']:10d} {drf['ms']:9.2f} {fast['ms']:9.2f} {speedup:7.1f}x"
+            )
+        self.stdout.write(self.style.SUCCESS('Outputs are byte-identical'))
+
+    def _listings(self, product_count, order_count):
+        """Dữ liệu đã serialize (ảnh + variants giả lập để có URL ảnh thật)"""
+        rng = random.Random(0)
+        products = generate_products(product_count, rng, timezone.now())
+        generate_orders(order_count, products, rng, timezone.now())
+        variants = {
+            'source': 'products/sample.jpg',
+            'webp': {str(w): variant_name('products/sample.jpg', w, 'webp') for w in (320, 640, 1024)},
+            'jpeg': {str(w): variant_name('products/sample.jpg', w, 'jpeg') for w in (320, 640, 1024)},
+        }
+        Product.objects.update(image='products/sample.jpg', image_variants=variants)
+
+        request = APIRequestFactory().get('/api/products/')
+        return {
+            'products': ProductSerializer(Product.objects.all(), many=True, context={'request': request}).data,
+            'orders': OrderSerializer(Order.objects.prefetch_related(ORDER_ITEMS_PREFETCH), many=True).data,
+        }
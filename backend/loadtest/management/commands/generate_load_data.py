@@ -0,0 +1,87 @@
+"""
+Sinh dữ liệu quy mô lớn để thử index, phân trang và export trên máy local
+"""
+import random
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from loadtest.generator import generate_orders, generate_products
+from metadent_backend.caching import invalidate_models
+from products.models import Product
+from products.search import rebuild_index
+
+
+class Progress:
+    """In tiến độ trên một dòng (TTY) hoặc mỗi 10% (log/pipe)"""
+
+    def __init__(self, stdout, label, total):
+        self.stdout = stdout
+        self.label = label
+        self.total = total
+        self.started = time.perf_counter()
+        self.tty = hasattr(stdout, 'isatty') and stdout.isatty()
+        self._next_report = 0.1
+
+    def __call__(self, done):
+        elapsed = time.perf_counter() - self.started
+        rate = done / elapsed if elapsed else 0
+        line = f'{self.label}: {done:,}/{self.total:,} ({done * 100 // self.total}%) {rate:,.0f}/s'
+        if self.tty:
+            self.stdout.write(f'\r{line}', ending='')
+            if done >= self.total:
+                self.stdout.write('')
+        elif done >= self.total or done / self.total >= self._next_report:
+            self._next_report = done / self.total + 0.1
+            self.stdout.write(line)
+
+
+class Command(BaseCommand):
+    help = 'Generate a large, deterministic data set of products, orders and order items for scale testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=10000, help='Number of products to create')
+        parser.add_argument('--orders', type=int, default=100000, help='Number of orders to create')
+        parser.add_argument('--max-items', type=int, default=5, help='Maximum distinct products per order')
+        parser.add_argument('--days', type=int, default=365, help='Spread created_at over this many days')
+        parser.add_argument('--end-date', help='Latest created_at (YYYY-MM-DD, default: now)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (same seed + end date = same data)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk INSERT transaction')
+        parser.add_argument('--skip-search-index', action='store_true',
+                            help='Do not rebuild the product search index afterwards')
+
+    def handle(self, *args, **options):
+        if options['products'] < 1 and options['orders'] > 0:
+            raise CommandError('Orders need at least one product')
+        end = timezone.now()
+        if options['end_date']:
+            try:
+                end = timezone.make_aware(datetime.strptime(options['end_date'], '%Y-%m-%d'))
+            except ValueError:
+                raise CommandError('--end-date must be YYYY-MM-DD')
+
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+
+        products = generate_products(
+            options['products'], rng, end, options['days'], options['batch_size'],
+            progress=Progress(self.stdout, 'Products', options['products']),
+        )
+        items = 0
+        if options['orders']:
+            items = generate_orders(
+                options['orders'], products, rng, end, options['days'], options['max_items'],
+                options['batch_size'], progress=Progress(self.stdout, 'Orders', options['orders']),
+            )
+        # bulk_create không phát post_save
+        invalidate_models(Product)
+        if not options['skip_search_index']:
+            self.stdout.write('Rebuilding product search index...')
+            rebuild_index()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(products):,} products, {options['orders']:,} orders and {items:,} order items "
+            f"in {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,45 @@
+"""
+Dữ liệu mẫu cho benchmark: sản phẩm và đơn hàng (loadtest/generator.py), cài
+đặt, ảnh trang và một tài khoản đăng nhập.
+"""
+import random
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from cms.models import PageImage, SiteSetting
+from products.models import Product
+from .generator import generate_orders, generate_products
+
+BENCH_USERNAME = 'bench'
+BENCH_PASSWORD = 'bench-password'
+
+CUSTOMER = {
+    'customer_name': 'Nguyễn Văn An',
+    'customer_email': 'an.nguyen@example.com',
+    'customer_phone': '0901234567',
+    'customer_address': '19V Nguyễn Hữu Cảnh, Phường 19, Quận Bình Thạnh, TP.HCM',
+}
+
+
+def seed_cms(settings_count):
+    SiteSetting.objects.bulk_create([
+        SiteSetting(key=f'setting_{i}', value=f'Giá trị {i}', category='other')
+        for i in range(settings_count)
+    ])
+    PageImage.objects.bulk_create([
+        PageImage(name=f'{position} {i}', position=position, image='', is_active=i == 0)
+        for position, _label in PageImage.POSITION_CHOICES
+        for i in range(2)
+    ])
+
+
+def seed(products=200, orders=500, settings=30, seed_value=0):
+    """Trả về danh sách Product (chỉ có pk và category) cho các kịch bản benchmark"""
+    rng = random.Random(seed_value)
+    end = timezone.now()
+    created = generate_products(products, rng, end, days=30)
+    generate_orders(orders, created, rng, end, days=30, max_items=3)
+    seed_cms(settings)
+    User.objects.create_user(BENCH_USERNAME, password=BENCH_PASSWORD)
+    return list(Product.objects.only('pk', 'category'))
@@ -0,0 +1,229 @@
+import random
+import re
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F, Sum
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cart.models import Order, OrderItem
+from cart.rollups import refresh_rollups
+from cms.models import PageImage, SiteSetting
+from metadent_backend.caching import response_cache
+from products.models import Product
+from products.search import rebuild_index
+from .benchmark import ISOLATED_CACHES, compare, percentile, run_benchmark
+from .generator import generate_orders, generate_products
+from .seed import CUSTOMER, seed, seed_cms
+
+
+class BenchmarkTests(TestCase):
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.50), 50)
+        self.assertEqual(percentile(values, 0.95), 95)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([7], 0.99), 7)
+
+    def test_compare_flags_query_and_latency_regressions(self):
+        baseline = {'scenarios': {'product_list': {'p95_ms': 10.0, 'rps': 100.0, 'queries_max': 2}}}
+        ok = {'product_list': {'p95_ms': 12.0, 'rps': 90.0, 'queries_max': 2}}
+        self.assertEqual(compare(ok, baseline, tolerance=0.5), [])
+
+        slow = {'product_list': {'p95_ms': 30.0, 'rps': 40.0, 'queries_max': 22}}
+        regressions = compare(slow, baseline, tolerance=0.5)
+        self.assertEqual(len(regressions), 3)
+        self.assertIn('queries/request 2 -> 22', regressions[0])
+
+    def test_runs_scenarios_against_urlconf(self):
+        products = seed(products=8, orders=5, settings=3)
+        results = run_benchmark(products, requests=3, warmup=1, only=['product_list', 'create_order', 'order_list'])
+        self.assertEqual(set(results), {'product_list', 'product_list_uncached', 'create_order', 'order_list'})
+        self.assertEqual(results['product_list']['requests'], 3)
+        # Đường không cache luôn chạy query; bản cache trúng sau lần khởi động
+        self.assertGreater(results['product_list_uncached']['queries_avg'], 0)
+        self.assertEqual(results['product_list']['queries_max'], 0)
+        self.assertGreater(results['create_order']['queries_max'], 0)
+
+
+class GenerateLoadDataTests(TestCase):
+    END = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+    def snapshot(self, seed_value):
+        Order.objects.all().delete()
+        Product.objects.all().delete()
+        rng = random.Random(seed_value)
+        products = generate_products(20, rng, self.END, batch_size=7)
+        generate_orders(30, products, rng, self.END, batch_size=7)
+        return (
+            list(Product.objects.order_by('id').values_list('name', 'price', 'category', 'created_at')),
+            list(Order.objects.order_by('id').values_list(
+                'customer_name', 'customer_address', 'total_amount', 'status', 'created_at'
+            )),
+        )
+
+    def test_same_seed_gives_same_data(self):
+        first = self.snapshot(seed_value=42)
+        self.assertEqual(first, self.snapshot(seed_value=42))
+        self.assertNotEqual(first, self.snapshot(seed_value=43))
+
+    def test_orders_are_consistent(self):
+        self.snapshot(seed_value=1)
+        self.assertEqual(Order.objects.count(), 30)
+        self.assertFalse(Order.objects.filter(created_at__gt=self.END).exists())
+        for order in Order.objects.annotate(items_total=Sum(F('items__price') * F('items__quantity'))):
+            self.assertEqual(order.total_amount, order.items_total)
+
+    def test_command_reports_progress(self):
+        out = StringIO()
+        call_command('generate_load_data', products=5, orders=12, batch_size=5, end_date='2026-01-01', stdout=out)
+        self.assertEqual(Order.objects.count(), 12)
+        self.assertTrue(OrderItem.objects.exists())
+        self.assertIn('Orders: 12/12 (100%)', out.getvalue())
+
+
+def route_names(patterns=None, namespace=None):
+    """Tên (kèm namespace) của mọi route trong ROOT_URLCONF"""
+    names = set()
+    for pattern in patterns if patterns is not None else get_resolver().url_patterns:
+        if isinstance(pattern, URLResolver):
+            inner = pattern.namespace or namespace
+            names |= route_names(pattern.url_patterns, inner)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.add(f'{namespace}:{pattern.name}' if namespace else pattern.name)
+    return names
+
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def _normalize(sql):
+    return _LITERAL_RE.sub('?', sql)
+
+
+def explain_growth(small, large):
+    """Các câu SQL xuất hiện nhiều lần hơn khi dữ liệu lớn hơn (thường là N+1)"""
+    before = Counter(_normalize(query['sql']) for query in small)
+    after = Counter(_normalize(query['sql']) for query in large)
+    lines = [
+        f'  {after[sql] - before[sql]:+d}x {sql}'
+        for sql in after if after[sql] > before[sql]
+    ]
+    lines.append('All queries at the larger size:')
+    lines.extend(f'  {index}. {query["sql"]}' for index, query in enumerate(large, 1))
+    return '\n'.join(lines)
+
+
+@override_settings(CACHES=ISOLATED_CACHES)
+class QueryCountRegressionTests(TestCase):
+    """
+    Mỗi route được gọi ở hai kích thước dữ liệu; số query phải không đổi.
+    Route mới trong metadent_backend.urls phải được thêm vào CASES.
+    """
+    SMALL, LARGE = 3, 12
+    EXCLUDED_NAMESPACES = ('admin',)
+
+    def setUp(self):
+        self.rng = random.Random(0)
+        self.end = timezone.now()
+        self.user = User.objects.create_user('staff', password='secret-pass')
+        seed_cms(0)
+        self.size = 0
+
+    def grow(self, size):
+        """Thêm dữ liệu cho tới `size` sản phẩm / đơn hàng / cài đặt"""
+        extra = size - self.size
+        products = generate_products(extra, self.rng, self.end, days=30)
+        generate_orders(extra, products, self.rng, self.end, days=30, max_items=3)
+        SiteSetting.objects.bulk_create([
+            SiteSetting(key=f'setting_{self.size + i}', value='Giá trị', category='other') for i in range(extra)
+        ])
+        PageImage.objects.bulk_create([
+            PageImage(name=f'Slide {self.size + i}', position='hero', image='') for i in range(extra)
+        ])
+        rebuild_index()
+        refresh_rollups(full=True)
+        self.size = size
+
+    # --- các request ---------------------------------------------------------
+
+    def _first(self, model):
+        return model.objects.order_by('pk').values_list('pk', flat=True).first()
+
+    def _order(self, client):
+        items = [{'product_id': pk, 'quantity': 1} for pk in Product.objects.values_list('pk', flat=True)]
+        return client.post(reverse('create-order'), {'cart_items': items, 'customer': CUSTOMER}, format='json')
+
+    CASES = {
+        'login': lambda self, c: c.post(reverse('login'), {'username': 'staff', 'password': 'secret-pass'},
+                                        format='json'),
+        'logout': lambda self, c: c.post(reverse('logout')),
+        'check-auth': lambda self, c: c.get(reverse('check-auth')),
+        'product-list': lambda self, c: c.get(reverse('product-list'), {'cursor': ''}),
+        'product-search': lambda self, c: c.get(reverse('product-search'), {'q': 'chinh hang'}),
+        'product-detail': lambda self, c: c.get(reverse('product-detail', args=[self._first(Product)])),
+        'products-by-category': lambda self, c: c.get(reverse('products-by-category', args=['other'])),
+        'create-order': _order,
+        'order-list': lambda self, c: c.get(reverse('order-list')),
+        'order-export': lambda self, c: c.get(reverse('order-export'), {'type': 'ndjson'}),
+        'order-stats': lambda self, c: c.get(reverse('order-stats')),
+        'order-detail': lambda self, c: c.get(reverse('order-detail', args=[self._first(Order)])),
+        'page-image-list': lambda self, c: c.get(reverse('page-image-list')),
+        'page-image-detail': lambda self, c: c.get(reverse('page-image-detail', args=[self._first(PageImage)])),
+        'setting-list': lambda self, c: c.get(reverse('setting-list')),
+        'setting-detail': lambda self, c: c.get(reverse('setting-detail', args=[self._first(SiteSetting)])),
+        'cms-bootstrap': lambda self, c: c.get(reverse('cms-bootstrap')),
+        'address-provinces': lambda self, c: c.get(reverse('address-provinces')),
+        'address-districts': lambda self, c: c.get(reverse('address-districts', args=[79])),
+        'address-wards': lambda self, c: c.get(reverse('address-wards', args=[760])),
+        'address-search': lambda self, c: c.get(reverse('address-search'), {'q': 'ho chi'}),
+        'address-resolve': lambda self, c: c.get(reverse('address-resolve'), {'province': 79}),
+        'metrics': lambda self, c: c.get(reverse('metrics')),
+    }
+
+    def measure(self, name):
+        client = APIClient()
+        client.force_login(self.user)
+        response_cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.CASES[name](self, client)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 500, f'{name}: HTTP {response.status_code}')
+        return context.captured_queries
+
+    def test_every_route_is_covered(self):
+        routes = {name for name in route_names() if name.split(':')[0] not in self.EXCLUDED_NAMESPACES}
+        self.assertEqual(routes - set(self.CASES), set(), 'Add query-count cases for these routes')
+
+    def test_address_lookups_return_rows_without_queries(self):
+        # Dữ liệu địa chỉ nằm trong bộ nhớ: tra cứu quận/phường không chạm database
+        client = APIClient()
+        for name, code in (('address-districts', 79), ('address-wards', 760)):
+            with self.subTest(route=name):
+                with self.assertNumQueries(0):
+                    response = client.get(reverse(name, args=[code]))
+                self.assertEqual(response.status_code, 200)
+                self.assertGreater(len(response.data), 0)
+                self.assertTrue(all(item['code'] and item['name'] for item in response.data))
+
+    def test_query_count_does_not_grow_with_data(self):
+        self.grow(self.SMALL)
+        small = {name: self.measure(name) for name in self.CASES}
+        self.grow(self.LARGE)
+        for name in self.CASES:
+            with self.subTest(route=name):
+                large = self.measure(name)
+                self.assertEqual(
+                    len(large), len(small[name]),
+                    f'{name}: {len(small[name])} queries with {self.SMALL} rows, '
+                    f'{len(large)} with {self.LARGE}\n{explain_growth(small[name], large)}'
+                )
@@ -0,0 +1,399 @@
+"""
+Cache nhiều tầng cho response của các API đọc (GET/HEAD) và các phép tính đắt.
+
+- Tầng 1: LRU trong process (LocalLRU), tra cứu không tốn I/O.
+- Tầng 2: cache dùng chung giữa các worker (CACHES[RESPONSE_CACHE_ALIAS],
+  mặc định file cache; CACHE_BACKEND=db dùng bảng cache trong database).
+
+Response được lưu sau khi render (body + Content-Type/ETag/Last-Modified/
+Cache-Control), nên request trúng cache trả 200 hoặc 304 mà không chạy query nào.
+
+Invalidation theo tag: mỗi tag (label model, ví dụ 'products.product') có một
+phiên bản là token ngẫu nhiên lưu ở tầng dùng chung. Mỗi entry ghi lại phiên
+bản các tag lúc được tính; entry có phiên bản cũ coi như đã hết hạn. Signal
+post_save/post_delete của Product, PageImage, SiteSetting (và các chỗ cập nhật
+bằng queryset.update như sinh variants) gọi invalidate_models().
+
+Tag theo dòng ('products.product:<pk>') chỉ dùng cho view chi tiết: pk lấy từ
+URL nên phiên bản được đọc trước khi view chạy query, như tag model.
+invalidate_rows() (trừ kho khi checkout) chỉ làm hết hạn trang chi tiết của các
+dòng đó; danh sách chỉ theo tag model nên tồn kho trong danh sách có thể chậm
+tối đa RESPONSE_CACHE_TIMEOUT (checkout luôn kiểm tra lại kho).
+Phiên bản tag được nhớ trong process tối đa RESPONSE_CACHE_TAG_TTL giây: worker
+gây ra thay đổi thấy ngay, worker khác thấy chậm nhất chừng đó.
+
+Chống stampede (get_or_set):
+- Single-flight: chỉ request giữ được khóa `lock:<key>` (cache.add trên tầng
+  dùng chung) mới tính lại; request khác nhận bản cũ (X-Cache: STALE), hoặc
+  nếu không có bản dùng được thì chờ bản mới tối đa RESPONSE_CACHE_LOCK_WAIT giây.
+- Bản cũ được giữ thêm RESPONSE_CACHE_STALE_TTL giây sau khi hết hạn, và chỉ
+  được trả khi hết hạn theo thời gian. Entry bị invalidate (phiên bản tag khác)
+  không bao giờ được trả: dữ liệu đã đổi, request phải chờ bản mới.
+- Refresh sớm theo xác suất (XFetch): request có thể tính lại trước hạn với xác
+  suất tăng dần khi gần hết hạn, tỉ lệ với thời gian tính lần trước, nên entry
+  nóng thường được làm mới trước khi thật sự hết hạn.
+Với file cache, cache.add không nguyên tử giữa các process: hiếm khi hai worker
+cùng tính một khóa, không ảnh hưởng tính đúng.
+"""
+import functools
+import hashlib
+import math
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from .metrics import RESPONSE_CACHE
+
+DEFAULT_TIMEOUT = 300
+DEFAULT_STALE_TTL = 300
+DEFAULT_LOCAL_ENTRIES = 1024
+DEFAULT_TAG_TTL = 1.0
+DEFAULT_LOCK_TIMEOUT = 30
+DEFAULT_LOCK_WAIT = 5.0
+DEFAULT_EARLY_REFRESH_BETA = 1.0
+LOCK_POLL_INTERVAL = 0.01
+
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+
+def model_tag(model):
+    return model._meta.label_lower
+
+
+def row_tag(model, pk):
+    return f'{model_tag(model)}:{pk}'
+
+
+def _tag(value):
+    return value if isinstance(value, str) else model_tag(value)
+
+
+class LocalLRU:
+    """LRU giới hạn theo số entry, mỗi entry có hạn (time.time()), an toàn giữa các thread"""
+
+    def __init__(self, max_entries=DEFAULT_LOCAL_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TieredCache:
+    def __init__(self, alias=None, local_entries=None, tag_ttl=None, timeout=None):
+        self.alias = alias or getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')
+        self.timeout = timeout or getattr(settings, 'RESPONSE_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+        self.tag_ttl = tag_ttl if tag_ttl is not None else getattr(
+            settings, 'RESPONSE_CACHE_TAG_TTL', DEFAULT_TAG_TTL
+        )
+        self.local = LocalLRU(local_entries or getattr(
+            settings, 'RESPONSE_CACHE_LOCAL_ENTRIES', DEFAULT_LOCAL_ENTRIES
+        ))
+        self.stale_ttl = getattr(settings, 'RESPONSE_CACHE_STALE_TTL', DEFAULT_STALE_TTL)
+        self.lock_timeout = getattr(settings, 'RESPONSE_CACHE_LOCK_TIMEOUT', DEFAULT_LOCK_TIMEOUT)
+        self.lock_wait = getattr(settings, 'RESPONSE_CACHE_LOCK_WAIT', DEFAULT_LOCK_WAIT)
+        self.beta = getattr(settings, 'RESPONSE_CACHE_EARLY_REFRESH_BETA', DEFAULT_EARLY_REFRESH_BETA)
+        self._tags = {}
+        self._tags_lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    # --- entry ---------------------------------------------------------------
+
+    def _is_current(self, entry, versions):
+        """Không bị invalidate: phiên bản các tag chưa đổi"""
+        return entry['versions'] == versions
+
+    def _is_fresh(self, entry, versions, now):
+        return now < entry['fresh_until'] and self._is_current(entry, versions)
+
+    def _lookup(self, key, versions, now):
+        """(entry, 'local' | 'shared'): entry còn hạn nếu có, không thì bản cũ (hoặc None)"""
+        local = self.local.get(key)
+        if local is not None and self._is_fresh(local, versions, now):
+            return local, 'local'
+        shared = self.shared.get(key)
+        if shared is not None and shared['expires'] > now:
+            if local is None or shared['created'] > local['created']:
+                self.local.set(key, shared, shared['expires'])
+                return shared, 'shared'
+        return local, 'local'
+
+    def _store(self, key, value, versions, delta, timeout):
+        now = time.time()
+        timeout = timeout or self.timeout
+        entry = {
+            'value': value,
+            'versions': versions,
+            'created': now,
+            'delta': delta,
+            'fresh_until': now + timeout,
+            'expires': now + timeout + self.stale_ttl,
+        }
+        self.shared.set(key, entry, timeout + self.stale_ttl)
+        self.local.set(key, entry, entry['expires'])
+
+    def _refresh_early(self, entry, now):
+        """XFetch: now - delta * beta * ln(U) >= fresh_until, U ~ (0, 1]"""
+        return now - entry['delta'] * self.beta * math.log(1.0 - random.random()) >= entry['fresh_until']
+
+    def _acquire(self, key):
+        token = uuid.uuid4().hex
+        return token if self.shared.add(f'lock:{key}', token, self.lock_timeout) else None
+
+    def _release(self, key, token):
+        if self.shared.get(f'lock:{key}') == token:
+            self.shared.delete(f'lock:{key}')
+
+    def _compute(self, key, compute, versions, timeout, token):
+        try:
+            started = time.perf_counter()
+            value = compute()
+            if value is not None:
+                self._store(key, value, versions, time.perf_counter() - started, timeout)
+            return value
+        finally:
+            if token:
+                self._release(key, token)
+
+    def _wait(self, key, versions, since):
+        """
+        Chờ bên giữ khóa ghi entry mới theo đúng phiên bản tag; None nếu hết giờ
+        hoặc khóa được nhả mà không có entry như vậy (bên giữ khóa bắt đầu tính
+        trước lần invalidate).
+        """
+        def usable(entry):
+            return entry is not None and entry['created'] >= since and self._is_current(entry, versions)
+
+        deadline = time.monotonic() + self.lock_wait
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = self.local.get(key) or self.shared.get(key)
+            if usable(entry):
+                return entry
+            if self.shared.get(f'lock:{key}') is None:
+                entry = self.shared.get(key)
+                return entry if usable(entry) else None
+        return None
+
+    def get_or_set(self, key, compute, tags=(), timeout=None):
+        """
+        (value, kết quả) với kết quả là 'local' | 'shared' (trúng cache), 'stale'
+        (bản cũ, request khác đang tính lại) hoặc 'miss' (đã gọi compute()).
+        compute() trả về None nghĩa là không cache kết quả này.
+        """
+        versions = self.tag_versions(tags)
+        now = time.time()
+        entry, tier = self._lookup(key, versions, now)
+        current = entry is not None and self._is_current(entry, versions)
+        fresh = current and now < entry['fresh_until']
+        if fresh and not self._refresh_early(entry, now):
+            return entry['value'], tier
+
+        token = self._acquire(key)
+        if token:
+            return self._compute(key, compute, versions, timeout, token), 'miss'
+        if current:
+            # Request khác đang tính lại entry chỉ hết hạn theo thời gian: trả bản hiện có
+            return entry['value'], tier if fresh else 'stale'
+
+        entry = self._wait(key, versions, now)
+        if entry is not None:
+            return entry['value'], 'shared'
+        return self._compute(key, compute, versions, timeout, None), 'miss'
+
+    # --- tag -----------------------------------------------------------------
+
+    def tag_versions(self, tags):
+        now = time.monotonic()
+        versions, missing = {}, []
+        with self._tags_lock:
+            for tag in tags:
+                known = self._tags.get(tag)
+                if known is not None and now - known[1] < self.tag_ttl:
+                    versions[tag] = known[0]
+                else:
+                    missing.append(tag)
+        if missing:
+            keys = {f'tag:{tag}': tag for tag in missing}
+            found = self.shared.get_many(list(keys))
+            for key, tag in keys.items():
+                version = found.get(key)
+                if version is None:
+                    # Tag chưa có (hoặc bị evict): tạo mới, worker khác tạo trước thì dùng của nó
+                    version = uuid.uuid4().hex
+                    if not self.shared.add(key, version, None):
+                        version = self.shared.get(key) or version
+                versions[tag] = version
+            with self._tags_lock:
+                for tag in missing:
+                    self._tags[tag] = (versions[tag], now)
+        return versions
+
+    def _bump(self, tags):
+        versions = {tag: uuid.uuid4().hex for tag in tags}
+        self.shared.set_many({f'tag:{tag}': version for tag, version in versions.items()}, None)
+        now = time.monotonic()
+        with self._tags_lock:
+            for tag, version in versions.items():
+                self._tags[tag] = (version, now)
+
+    def invalidate(self, *tags):
+        tags = [_tag(tag) for tag in tags]
+        self._bump(tags)
+        if transaction.get_connection().in_atomic_block:
+            # Đổi thêm một lần sau commit: request đọc dữ liệu cũ trước commit
+            # có thể đã ghi entry theo phiên bản vừa đổi ở trên
+            transaction.on_commit(lambda: self._bump(tags))
+
+    def clear(self):
+        """Xóa cả hai tầng (dùng trong test / benchmark)"""
+        self.local.clear()
+        with self._tags_lock:
+            self._tags.clear()
+        self.shared.clear()
+
+
+response_cache = TieredCache()
+
+
+def invalidate_models(*models):
+    response_cache.invalidate(*models)
+
+
+def invalidate_rows(model, pks):
+    """Chỉ làm hết hạn các entry theo tag dòng của những pk này (view chi tiết)"""
+    tags = [row_tag(model, pk) for pk in pks]
+    if tags:
+        response_cache.invalidate(*tags)
+
+
+def cached(key, compute, tags=(), timeout=None):
+    """Giá trị của compute() qua response_cache (single-flight, serve-stale)"""
+    return response_cache.get_or_set(key, compute, tuple(sorted(_tag(tag) for tag in tags)), timeout)[0]
+
+
+def response_key(request):
+    raw = '|'.join([request.scheme, request.get_host(), request.get_full_path()])
+    return 'response:' + hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def _freeze(response):
+    return {
+        'content': response.content,
+        'headers': {name: response[name] for name in CACHED_HEADERS if response.has_header(name)},
+    }
+
+
+def _thaw(request, entry):
+    headers = entry['headers']
+    last_modified = parse_http_date_safe(headers['Last-Modified']) if 'Last-Modified' in headers else None
+    response = get_conditional_response(request, etag=headers.get('ETag'), last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(entry['content'], content_type=headers.get('Content-Type'))
+    for name, value in headers.items():
+        if name != 'Content-Type' or response.status_code == 200:
+            response[name] = value
+    return response
+
+
+def cache_response(tags, timeout=None, cache=None, row_model=None, row_kwarg='pk'):
+    """
+    Decorator cho view (function view của DRF hoặc kết quả của as_view()).
+    Chỉ cache response 200 không phải streaming của GET/HEAD; `tags` là model
+    hoặc chuỗi tag. `row_model`: entry theo thêm tag dòng row_tag(row_model,
+    kwargs[row_kwarg]) để invalidate_rows() làm hết hạn riêng trang chi tiết.
+    """
+    tags = tuple(sorted(_tag(tag) for tag in tags))
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            rendered = []
+
+            def compute():
+                response = view(request, *args, **kwargs)
+                rendered.append(response)
+                if response.status_code != 200 or response.streaming:
+                    return None
+                if callable(getattr(response, 'render', None)):
+                    started = time.perf_counter()
+                    response.render()
+                    # Render xảy ra trong view nên ServerTimingMiddleware không đo được
+                    timing = getattr(request, 'timing', None)
+                    if timing is not None:
+                        timing.render_time += time.perf_counter() - started
+                return _freeze(response)
+
+            entry_tags = tags
+            if row_model is not None and row_kwarg in kwargs:
+                entry_tags = tags + (row_tag(row_model, kwargs[row_kwarg]),)
+            entry, result = (cache or response_cache).get_or_set(
+                response_key(request), compute, entry_tags, timeout
+            )
+            view_name = request.resolver_match.url_name if request.resolver_match else None
+            RESPONSE_CACHE.inc(view=view_name or '<unresolved>', result=result)
+            if rendered:
+                response = rendered[0]
+                response['X-Cache'] = 'MISS'
+            else:
+                response = _thaw(request, entry)
+                response['X-Cache'] = 'STALE' if result == 'stale' else 'HIT'
+            return response
+        return wrapped
+    return decorator
+
+
+class CacheResponseMixin:
+    """
+    Mixin cho generic view của DRF: GET/HEAD đi qua cache_response, các method
+    khác chạy bình thường (và invalidate qua signal).
+    """
+    cache_tags = ()
+    cache_timeout = None
+    # View chi tiết: model của tag dòng, pk lấy từ URL kwarg lookup_url_kwarg / lookup_field
+    cache_row_model = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        row_kwarg = getattr(cls, 'lookup_url_kwarg', None) or getattr(cls, 'lookup_field', 'pk')
+        return cache_response(cls.cache_tags, cls.cache_timeout, row_model=cls.cache_row_model, row_kwarg=row_kwarg)(
+            super().as_view(**initkwargs)
+        )
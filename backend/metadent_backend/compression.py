@@ -0,0 +1,172 @@
+"""
+Nén response theo Accept-Encoding (brotli nếu có cài package `brotli`, ngược
+lại gzip) kèm cache bản đã nén trong process.
+
+Payload nóng (danh sách sản phẩm, settings, bootstrap CMS) ít thay đổi nên
+bản nén được giữ trong một LRU giới hạn theo byte, khóa theo phiên bản nội dung
+là hash BLAKE2 của body (nhanh hơn nén lại hàng chục lần và không bao giờ trả
+bản nén cũ khi nội dung đã đổi, kể cả khi ETag không đổi). Request sau chỉ tra cache.
+
+StreamingHttpResponse (export) được nén gzip theo luồng, không cache.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - tùy chọn
+    brotli = None
+
+MIN_SIZE = 200
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+DEFAULT_MAX_ENTRY_BYTES = 4 * 1024 * 1024
+BROTLI_QUALITY = 5
+# Giống GZipMiddleware của Django: thêm byte ngẫu nhiên vào header gzip (giảm rủi ro BREACH)
+GZIP_MAX_RANDOM_BYTES = 100
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/x-ndjson', 'application/javascript',
+                      'application/xml')
+
+_ACCEPT_RE = re.compile(r'\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+def accepted_encodings(header):
+    """{'gzip': 1.0, 'br': 0.5, ...} từ header Accept-Encoding"""
+    encodings = {}
+    for part in header.split(','):
+        match = _ACCEPT_RE.match(part)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        encodings[match.group(1).lower()] = quality
+    return encodings
+
+
+def choose_encoding(header, streaming=False):
+    encodings = accepted_encodings(header or '')
+    wildcard = encodings.get('*', 0)
+    candidates = ['gzip'] if streaming or brotli is None else ['br', 'gzip']
+    best, best_quality = None, 0
+    for encoding in candidates:
+        quality = encodings.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    return compress_string(content, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+
+
+class CompressedCache:
+    """LRU (theo tổng số byte) các bản nén, an toàn giữa các thread"""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes and self._entries:
+                _key, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def content_version(content):
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+class CompressionMiddleware:
+    """
+    Đặt sau MetricsMiddleware/ServerTimingMiddleware và trước các middleware
+    còn lại trong MIDDLEWARE.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.cache = CompressedCache(getattr(settings, 'COMPRESSION_CACHE_BYTES', DEFAULT_CACHE_BYTES))
+        self.max_entry_bytes = getattr(settings, 'COMPRESSION_MAX_ENTRY_BYTES', DEFAULT_MAX_ENTRY_BYTES)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self._compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'), response.streaming)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_sequence(
+                response.streaming_content, max_random_bytes=GZIP_MAX_RANDOM_BYTES
+            )
+            if response.has_header('Content-Length'):
+                del response['Content-Length']
+        else:
+            if len(response.content) < MIN_SIZE:
+                return response
+            compressed = self._compressed(response, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            # Bản nén khác byte với bản gốc: chỉ còn tương đương ngữ nghĩa
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    def _compressible(self, response):
+        if response.has_header('Content-Encoding') or response.status_code in (204, 206, 304):
+            return False
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return False
+        content_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _compressed(self, response, encoding):
+        content = response.content
+        if len(content) > self.max_entry_bytes:
+            return compress(content, encoding)
+        key = (content_version(content), encoding)
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = compress(content, encoding)
+            self.cache.set(key, compressed)
+        return compressed
@@ -0,0 +1,74 @@
+"""
+Conditional GET (ETag / Last-Modified) cho các API đọc.
+
+Validator được tính từ max(updated_at) và số dòng của queryset (một query
+aggregate), nên khi dữ liệu không đổi view trả về 304 mà không cần serialize.
+
+Response danh sách chỉ có ETag: xóa một dòng không phải mới nhất không làm đổi
+max(updated_at), nên Last-Modified / If-Modified-Since sẽ trả 304 kèm dữ liệu
+cũ. Chỉ ETag (có số dòng) mới được dùng để trả 304 cho danh sách.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def queryset_validators(request, queryset, field='updated_at'):
+    stats = queryset.order_by().aggregate(last_modified=Max(field), count=Count('pk'))
+    last_modified = stats['last_modified']
+    stamp = last_modified.isoformat() if last_modified else ''
+    # ETag phụ thuộc cả query string (filter, cursor, page_size...)
+    raw = f"{request.get_full_path()}|{stats['count']}|{stamp}"
+    etag = quote_etag(hashlib.md5(raw.encode('utf-8')).hexdigest())
+    return etag, (int(last_modified.timestamp()) if last_modified else None)
+
+
+def conditional_response(request, queryset, render, field='updated_at', collection=True):
+    """
+    Trả về 304 nếu validator của client còn khớp, ngược lại gọi render().
+    collection=False (một đối tượng): gửi thêm Last-Modified và chấp nhận If-Modified-Since.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return render()
+
+    etag, last_modified = queryset_validators(request, queryset, field)
+    if collection:
+        last_modified = None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = render()
+        if not 200 <= response.status_code < 300:
+            return response
+
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Buộc client/proxy revalidate thay vì tự đoán độ tươi từ Last-Modified
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Mixin cho generic list/retrieve view của DRF
+    """
+    conditional_field = 'updated_at'
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return conditional_response(
+            request, queryset, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+            self.conditional_field
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+        return conditional_response(
+            request, queryset, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs),
+            self.conditional_field, collection=False
+        )
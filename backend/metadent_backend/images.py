@@ -0,0 +1,159 @@
+"""
+Sinh ảnh phái sinh (responsive variants) cho Product.image và PageImage.image.
+
+Mỗi ảnh upload được resize về các chiều rộng cố định, lưu dưới dạng WebP và JPEG
+trong thư mục `variants/` cạnh ảnh gốc. Danh sách file được lưu vào field
+`image_variants` của model để serializer dựng srcset mà không cần chạm ổ đĩa.
+"""
+import io
+import logging
+import posixpath
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .caching import invalidate_models
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 1024, 1600)
+VARIANT_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+
+def variant_name(source_name, width, fmt):
+    # Giữ cả đuôi file gốc: a.png và a.jpg không được dùng chung variants
+    directory, filename = posixpath.split(source_name)
+    stem, ext = posixpath.splitext(filename)
+    suffix = f'-{ext[1:].lower()}' if ext else ''
+    return posixpath.join(directory, 'variants', f'{stem}{suffix}-{width}w.{fmt}')
+
+
+def target_widths(original_width):
+    widths = [w for w in VARIANT_WIDTHS if w < original_width]
+    widths.append(min(original_width, VARIANT_WIDTHS[-1]))
+    return sorted(set(widths))
+
+
+def _encode(image, fmt):
+    if fmt == 'jpeg' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        rgba = image.convert('RGBA')
+        background.paste(rgba, mask=rgba.split()[-1])
+        image = background
+    elif fmt == 'webp' and image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, **VARIANT_FORMATS[fmt])
+    return buffer.getvalue()
+
+
+def build_variants(fieldfile):
+    """
+    Resize ảnh gốc và ghi các variant vào storage.
+    Trả về dict {'source': name, 'webp': {'320': name, ...}, 'jpeg': {...}}.
+    """
+    storage = fieldfile.storage
+    with storage.open(fieldfile.name, 'rb') as fh:
+        original = Image.open(fh)
+        original = ImageOps.exif_transpose(original)
+        original.load()
+
+    variants = {'source': fieldfile.name}
+    for width in target_widths(original.width):
+        height = max(1, round(original.height * width / original.width))
+        resized = original if width == original.width else original.resize((width, height), Image.LANCZOS)
+        for fmt in VARIANT_FORMATS:
+            name = variant_name(fieldfile.name, width, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            saved = storage.save(name, ContentFile(_encode(resized, fmt)))
+            variants.setdefault(fmt, {})[str(width)] = saved
+    return variants
+
+
+def delete_variants(variants, storage, keep=()):
+    for fmt in VARIANT_FORMATS:
+        for name in (variants or {}).get(fmt, {}).values():
+            if name not in keep and storage.exists(name):
+                storage.delete(name)
+
+
+def ensure_variants(instance, force=False, raise_errors=False):
+    """
+    Sinh lại variants khi ảnh của instance thay đổi (hoặc khi force=True).
+    Cập nhật bằng queryset.update để không kích hoạt lại post_save.
+    raise_errors=True (job nền): lỗi đọc/ghi ảnh được raise để hàng đợi thử lại,
+    variants hiện có được giữ nguyên.
+    """
+    fieldfile = instance.image
+    current = instance.image_variants or {}
+    if not fieldfile and not current:
+        return False
+    if fieldfile and not force and current.get('source') == fieldfile.name:
+        return False
+
+    variants = {}
+    if fieldfile:
+        try:
+            variants = build_variants(fieldfile)
+        except Exception:
+            if raise_errors:
+                raise
+            logger.warning('Không thể tạo variants cho %s', fieldfile.name, exc_info=True)
+    delete_variants(current, fieldfile.storage, keep=set(variant_names(variants)))
+
+    if variants != current:
+        changes = {'image_variants': variants}
+        if any(field.name == 'updated_at' for field in instance._meta.concrete_fields):
+            # ETag/Last-Modified (metadent_backend/conditional.py) dựa trên updated_at
+            changes['updated_at'] = instance.updated_at = timezone.now()
+        type(instance).objects.filter(pk=instance.pk).update(**changes)
+        instance.image_variants = variants
+        invalidate_models(type(instance))
+    return bool(variants)
+
+
+def variants_outdated(instance):
+    current = instance.image_variants or {}
+    if not instance.image:
+        return bool(current)
+    return current.get('source') != instance.image.name
+
+
+def variant_names(variants):
+    return [name for fmt in VARIANT_FORMATS for name in (variants or {}).get(fmt, {}).values()]
+
+
+def generate_variants_task(model, pk, force=False):
+    """Job nền: model là 'app_label.ModelName'"""
+    instance = apps.get_model(model).objects.filter(pk=pk).first()
+    if instance is not None:
+        ensure_variants(instance, force=force, raise_errors=True)
+
+
+def delete_files_task(names):
+    """Job nền: xóa file gốc và variants sau khi bản ghi đã bị xóa"""
+    for name in names:
+        if name and default_storage.exists(name):
+            default_storage.delete(name)
+
+
+def build_srcset(variants, storage, request=None):
+    """{'webp': 'url 320w, url 640w', 'jpeg': '...'} từ image_variants"""
+    srcset = {}
+    for fmt in VARIANT_FORMATS:
+        entries = []
+        for width, name in sorted((variants or {}).get(fmt, {}).items(), key=lambda item: int(item[0])):
+            url = storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            entries.append(f'{url} {width}w')
+        if entries:
+            srcset[fmt] = ', '.join(entries)
+    return srcset
@@ -0,0 +1,263 @@
+"""
+Metrics theo định dạng text của Prometheus, phục vụ tại /metrics.
+
+Mỗi series được lưu dưới dạng một số cộng dồn, khóa là tên series đầy đủ
+(`name{label="value"}`); histogram được tách thành các series `_bucket`
+(cộng dồn theo `le`), `_sum` và `_count`. Vì mọi giá trị đều chỉ tăng nên gộp
+nhiều process chỉ là cộng các giá trị cùng khóa.
+
+Chạy nhiều worker (gunicorn/uvicorn): đặt METRICS_DIR tới một thư mục dùng
+chung. Mỗi process ghi số liệu của mình vào `<METRICS_DIR>/metrics-<pid>.json`
+(ghi file tạm rồi os.replace, tối đa một lần mỗi METRICS_FLUSH_INTERVAL giây)
+và /metrics cộng tất cả các file lại. Process khởi động lại trùng pid sẽ nạp
+tiếp số liệu từ file cũ nên counter không bị mất. Không đặt METRICS_DIR thì
+số liệu chỉ nằm trong bộ nhớ của process hiện tại.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _series(name, labels):
+    if not labels:
+        return name
+    body = ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return f'{name}{{{body}}}'
+
+
+def _sort_key(key):
+    """Sắp bucket theo giá trị số của `le` thay vì theo chuỗi"""
+    head, sep, le = key.partition('le="')
+    if not sep:
+        return key, 0.0
+    return head, float(le.split('"', 1)[0])
+
+
+def _format_number(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self._values = {}
+        self._lock = threading.Lock()
+        self._pid = None
+        self._last_flush = 0.0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    # --- ghi -------------------------------------------------------------
+
+    def add(self, increments):
+        with self._lock:
+            self._ensure_process()
+            for key, amount in increments:
+                self._values[key] = self._values.get(key, 0) + amount
+        self._maybe_flush()
+
+    def _ensure_process(self):
+        """Sau fork (gunicorn preload) process con bắt đầu lại từ file của chính nó"""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        self._pid = pid
+        self._values = {}
+        path = self._path()
+        if path is not None and path.exists():
+            try:
+                self._values = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                self._values = {}
+
+    # --- đồng bộ giữa các process ----------------------------------------
+
+    @staticmethod
+    def directory():
+        directory = getattr(settings, 'METRICS_DIR', None)
+        return Path(directory) if directory else None
+
+    def _path(self):
+        directory = self.directory()
+        return directory / f'metrics-{os.getpid()}.json' if directory else None
+
+    def _maybe_flush(self):
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+        if self.directory() is not None and time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def flush(self):
+        path = self._path()
+        if path is None:
+            return
+        with self._lock:
+            self._ensure_process()
+            data = json.dumps(self._values)
+            self._last_flush = time.monotonic()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        tmp.write_text(data, encoding='utf-8')
+        os.replace(tmp, path)
+
+    def collect(self):
+        """Giá trị đã gộp của mọi process"""
+        directory = self.directory()
+        if directory is None:
+            with self._lock:
+                self._ensure_process()
+                return dict(self._values)
+
+        self.flush()
+        totals = {}
+        for path in directory.glob('metrics-*.json'):
+            try:
+                values = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                continue
+            for key, value in values.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+            self._pid = None
+        directory = self.directory()
+        if directory is not None:
+            for path in directory.glob('metrics-*.json'):
+                path.unlink(missing_ok=True)
+
+    # --- xuất --------------------------------------------------------------
+
+    def exposition(self):
+        values = self.collect()
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            prefixes = metric.series_prefixes()
+            series = sorted((key for key in values if key.split('{', 1)[0] in prefixes), key=_sort_key)
+            if not series and not metric.labelnames:
+                series = [name]
+            for key in series:
+                lines.append(f'{key} {_format_number(values.get(key, 0))}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry
+        registry.register(self)
+
+    def _labels(self, labels):
+        return tuple((name, labels.get(name, '')) for name in self.labelnames)
+
+    def series_prefixes(self):
+        return {self.name}
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        self.registry.add([(_series(self.name, self._labels(labels)), amount)])
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, registry=REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = [(bound, str(bound)) for bound in buckets] + [(float('inf'), '+Inf')]
+
+    def series_prefixes(self):
+        return {f'{self.name}_bucket', f'{self.name}_sum', f'{self.name}_count'}
+
+    def observe(self, value, **labels):
+        base = self._labels(labels)
+        increments = [
+            (_series(f'{self.name}_bucket', base + (('le', le),)), 1)
+            for bound, le in self.buckets if value <= bound
+        ]
+        increments.append((_series(f'{self.name}_sum', base), value))
+        increments.append((_series(f'{self.name}_count', base), 1))
+        self.registry.add(increments)
+
+
+# --- metrics của ứng dụng ----------------------------------------------------
+
+REQUESTS = Counter('http_requests_total', 'HTTP requests by URL name, method and status', ['view', 'method', 'status'])
+REQUEST_ERRORS = Counter('http_request_errors_total', 'HTTP responses with status >= 500 by URL name', ['view'])
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP request latency by URL name', ['view'])
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', 'DB queries per sampled request by URL name', ['view'], buckets=QUERY_BUCKETS
+)
+ORDERS_CREATED = Counter('orders_created_total', 'Orders created through checkout')
+CHECKOUT_FAILURES = Counter('checkout_failures_total', 'Rejected checkouts by reason', ['reason'])
+LOGIN_ATTEMPTS = Counter('login_attempts_total', 'Login attempts by result', ['result'])
+RESPONSE_CACHE = Counter(
+    'response_cache_lookups_total', 'Response cache lookups by URL name and result (local, shared, stale, miss)',
+    ['view', 'result']
+)
+
+
+class MetricsMiddleware:
+    """
+    Đặt trước ServerTimingMiddleware: dùng thời gian và số query mà
+    request.timing đã đo, không tự đo lại.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        # Không dùng path làm label để số series không tăng theo URL (404, id...)
+        view = resolver_match.view_name if resolver_match and resolver_match.view_name else '<unmatched>'
+        timing = getattr(request, 'timing', None)
+        elapsed = timing.total if timing is not None and timing.total else time.perf_counter() - started
+
+        REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        if response.status_code >= 500:
+            REQUEST_ERRORS.inc(view=view)
+        REQUEST_LATENCY.observe(elapsed, view=view)
+        if timing is not None and timing.sampled:
+            REQUEST_QUERIES.observe(timing.db_queries, view=view)
+        return response
+
+
+def metrics_view(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    return HttpResponse(REGISTRY.exposition(), content_type=CONTENT_TYPE)
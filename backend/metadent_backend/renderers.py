@@ -0,0 +1,67 @@
+"""
+Renderer / parser JSON dùng orjson nếu đã cài, cho output giống hệt
+rest_framework.renderers.JSONRenderer.
+
+- datetime / date / time, Decimal, lazy string... đi qua đúng hàm default()
+  của encoder DRF (OPT_PASSTHROUGH_DATETIME), nên định dạng không đổi:
+  datetime UTC kết thúc bằng 'Z', Decimal thô thành số thực.
+- \\u2028 / \\u2029 vẫn được escape như DRF.
+- Những trường hợp orjson không làm được y hệt (indent, UNICODE_JSON=False,
+  COMPACT_JSON=False, số nguyên > 64 bit, encoding khác UTF-8) quay về
+  JSONRenderer / JSONParser gốc.
+
+Không cài orjson thì hai class này hoạt động đúng như bản của DRF.
+"""
+import io
+import re
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - tùy chọn
+    orjson = None
+
+_default = JSONEncoder().default
+_LONG_NUMBER_RE = re.compile(rb'\d{19}')
+
+
+class FastJSONRenderer(JSONRenderer):
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        # orjson đọc số nguyên > 64 bit thành float; để JSONParser gốc xử lý
+        if _LONG_NUMBER_RE.search(body) is None:
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        # Trả ParseError cùng định dạng với DRF
+        return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -45,9 +45,15 @@ INSTALLED_APPS = [
     'cart',
     'cms',
     'accounts',
+    'jobs',
+    'address',
+    'loadtest',
 ]
 
 MIDDLEWARE = [
+    'metadent_backend.metrics.MetricsMiddleware',
+    'metadent_backend.timing.ServerTimingMiddleware',
+    'metadent_backend.compression.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -81,6 +87,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'metadent_backend.wsgi.application'
 
+# `manage.py test` chạy trên cache locmem riêng (metadent_backend/test_runner.py)
+TEST_RUNNER = 'metadent_backend.test_runner.TestRunner'
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
@@ -100,6 +109,45 @@ else:
         'default': dj_database_url.parse(DATABASE_URL)
     }
 
+# Cache dùng chung giữa các worker (tầng 2 của metadent_backend/caching.py).
+# CACHE_BACKEND=file (mặc định, CACHE_LOCATION là thư mục), db (CACHE_LOCATION là
+# tên bảng, tạo bằng `manage.py createcachetable`) hoặc locmem (chỉ trong process)
+CACHE_BACKEND = config('CACHE_BACKEND', default='file')
+
+if CACHE_BACKEND == 'db':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': config('CACHE_LOCATION', default='metadent_cache'),
+        }
+    }
+elif CACHE_BACKEND == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / 'cache')),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# Response cache của các API đọc (metadent_backend/caching.py)
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+RESPONSE_CACHE_LOCAL_ENTRIES = config('RESPONSE_CACHE_LOCAL_ENTRIES', default=1024, cast=int)
+RESPONSE_CACHE_TAG_TTL = config('RESPONSE_CACHE_TAG_TTL', default=1.0, cast=float)
+# Chống stampede: bản cũ được phục vụ thêm STALE_TTL giây trong lúc một request tính lại;
+# EARLY_REFRESH_BETA > 1 làm mới sớm hơn, 0 tắt refresh sớm
+RESPONSE_CACHE_STALE_TTL = config('RESPONSE_CACHE_STALE_TTL', default=300, cast=int)
+RESPONSE_CACHE_LOCK_TIMEOUT = config('RESPONSE_CACHE_LOCK_TIMEOUT', default=30, cast=int)
+RESPONSE_CACHE_LOCK_WAIT = config('RESPONSE_CACHE_LOCK_WAIT', default=5.0, cast=float)
+RESPONSE_CACHE_EARLY_REFRESH_BETA = config('RESPONSE_CACHE_EARLY_REFRESH_BETA', default=1.0, cast=float)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -160,7 +208,9 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'idempotency-key',
 ]
+CORS_EXPOSE_HEADERS = ['server-timing', 'x-address-dataset-version']
 
 # CSRF settings - Disable for API endpoints  
 CSRF_TRUSTED_ORIGINS = [
@@ -178,13 +228,29 @@ CSRF_USE_SESSIONS = False
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Request timing (metadent_backend/timing.py)
+SERVER_TIMING_SAMPLE_RATE = config('SERVER_TIMING_SAMPLE_RATE', default=1.0, cast=float)
+SERVER_TIMING_OVERHEAD_BUDGET = config('SERVER_TIMING_OVERHEAD_BUDGET', default=0.02, cast=float)
+SLOW_REQUEST_MS = config('SLOW_REQUEST_MS', default=500, cast=int)
+
+# Prometheus metrics (metadent_backend/metrics.py). Với nhiều worker đặt METRICS_DIR
+# tới một thư mục dùng chung; METRICS_TOKEN (nếu có) bắt buộc header Authorization: Bearer
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    # orjson nếu có cài, output giống hệt JSONRenderer (metadent_backend/renderers.py)
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'metadent_backend.renderers.FastJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'metadent_backend.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
@@ -223,5 +289,17 @@ LOGGING = {
             'level': 'INFO',
             'propagate': True,
         },
+        # INFO: mọi request được đo; WARNING: chỉ request chậm
+        'metadent_backend.timing': {
+            'handlers': ['file', 'console'],
+            'level': config('TIMING_LOG_LEVEL', default='WARNING'),
+            'propagate': False,
+        },
+        # Throughput của các test tải/đồng thời; LOADTEST_LOG_LEVEL=INFO để in ra
+        'loadtest': {
+            'handlers': ['console'],
+            'level': config('LOADTEST_LOG_LEVEL', default='WARNING'),
+            'propagate': False,
+        },
     },
 }
\ No newline at end of file
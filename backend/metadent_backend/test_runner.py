@@ -0,0 +1,26 @@
+"""
+Test runner của project: chạy test trên cache locmem riêng thay vì CACHES của
+môi trường (mặc định file cache dùng chung với server dev), để test không đọc
+entry do lần chạy trước ghi ra và response_cache.clear() không xóa cache thật.
+"""
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._caches = override_settings(CACHES=TEST_CACHES)
+        self._caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,8 @@
+import unicodedata
+
+
+def fold(text):
+    """Bỏ dấu tiếng Việt và chuyển chữ thường: 'Máy tăm nước Đức' -> 'may tam nuoc duc'"""
+    text = (text or '').replace('đ', 'd').replace('Đ', 'D')
+    decomposed = unicodedata.normalize('NFD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
@@ -0,0 +1,204 @@
+"""
+Đo thời gian xử lý từng request: tổng thời gian, số query + thời gian DB và
+thời gian render (serialize response thành JSON).
+
+Kết quả được trả về trong header `Server-Timing` (xem được trong tab Network
+của trình duyệt) và ghi vào logger `metadent_backend.timing` dưới dạng field
+có cấu trúc (`extra`). Request chậm hơn SLOW_REQUEST_MS được ghi ở mức WARNING
+kèm các query tốn thời gian nhất.
+
+Chi phí khi bật trên production:
+- Chỉ một phần request được lấy mẫu (SERVER_TIMING_SAMPLE_RATE) để đo DB;
+  request không được lấy mẫu chỉ tốn hai lần perf_counter().
+- Thời gian tự đo của middleware được cộng dồn; khi vượt ngân sách
+  (SERVER_TIMING_OVERHEAD_BUDGET, tỉ lệ so với thời gian request) tỉ lệ lấy
+  mẫu tự giảm một nửa, và tăng dần trở lại khi đã xuống dưới ngân sách.
+"""
+import heapq
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_RATE = 1.0
+DEFAULT_SLOW_REQUEST_MS = 500
+DEFAULT_OVERHEAD_BUDGET = 0.02
+MIN_SAMPLE_RATE = 0.01
+TOP_QUERIES = 5
+SQL_LOG_LENGTH = 500
+
+
+def get_setting(name, default):
+    return getattr(settings, name, default)
+
+
+class RequestTiming:
+    """Số đo của một request, gắn vào request.timing"""
+    __slots__ = ('sampled', 'started', 'total', 'db_queries', 'db_time', 'render_time',
+                 'render_started', 'overhead', '_top', '_seq')
+
+    def __init__(self, sampled):
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.render_started = None
+        self.overhead = 0.0
+        self._top = []
+        self._seq = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """execute_wrapper của Django: đếm và đo thời gian từng query"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            finished = time.perf_counter()
+            duration = finished - started
+            self.db_queries += 1
+            self.db_time += duration
+            # Chỉ giữ TOP_QUERIES query chậm nhất (min-heap), không lưu toàn bộ SQL
+            self._seq += 1
+            entry = (duration, self._seq, sql)
+            if len(self._top) < TOP_QUERIES:
+                heapq.heappush(self._top, entry)
+            elif duration > self._top[0][0]:
+                heapq.heapreplace(self._top, entry)
+            self.overhead += time.perf_counter() - finished
+
+    def top_queries(self):
+        return [
+            {'ms': round(duration * 1000, 2), 'sql': sql[:SQL_LOG_LENGTH]}
+            for duration, _seq, sql in sorted(self._top, reverse=True)
+        ]
+
+    def as_fields(self):
+        fields = {'total_ms': round(self.total * 1000, 2), 'render_ms': round(self.render_time * 1000, 2)}
+        if self.sampled:
+            fields['db_queries'] = self.db_queries
+            fields['db_ms'] = round(self.db_time * 1000, 2)
+        return fields
+
+    def header(self):
+        parts = []
+        if self.sampled:
+            parts.append(f'db;dur={self.db_time * 1000:.2f};desc="{self.db_queries} queries"')
+        if self.render_time:
+            parts.append(f'render;dur={self.render_time * 1000:.2f}')
+        parts.append(f'total;dur={self.total * 1000:.2f}')
+        return ', '.join(parts)
+
+
+class AdaptiveSampler:
+    """Tỉ lệ lấy mẫu tự điều chỉnh theo chi phí đo đạc thực tế"""
+    WINDOW = 200
+
+    def __init__(self, rate, budget):
+        self.max_rate = rate
+        self.rate = rate
+        self.budget = budget
+        self._lock = threading.Lock()
+        self._overhead = 0.0
+        self._elapsed = 0.0
+        self._requests = 0
+
+    def should_sample(self):
+        return self.rate >= 1.0 or random.random() < self.rate
+
+    def record(self, overhead, elapsed):
+        with self._lock:
+            self._overhead += overhead
+            self._elapsed += elapsed
+            self._requests += 1
+            if self._requests < self.WINDOW:
+                return
+            ratio = self._overhead / self._elapsed if self._elapsed else 0.0
+            if ratio > self.budget:
+                self.rate = max(MIN_SAMPLE_RATE, self.rate / 2)
+            elif ratio < self.budget / 2:
+                self.rate = min(self.max_rate, self.rate * 1.25)
+            self._overhead = self._elapsed = 0.0
+            self._requests = 0
+
+
+class ServerTimingMiddleware:
+    """
+    Đặt đầu MIDDLEWARE để đo toàn bộ thời gian xử lý. Với StreamingHttpResponse
+    thời gian chỉ tính tới lúc bắt đầu gửi body.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sampler = AdaptiveSampler(
+            get_setting('SERVER_TIMING_SAMPLE_RATE', DEFAULT_SAMPLE_RATE),
+            get_setting('SERVER_TIMING_OVERHEAD_BUDGET', DEFAULT_OVERHEAD_BUDGET),
+        )
+        self.slow_request = get_setting('SLOW_REQUEST_MS', DEFAULT_SLOW_REQUEST_MS) / 1000
+        self.send_header = get_setting('SERVER_TIMING_HEADER', True)
+
+    def __call__(self, request):
+        timing = RequestTiming(self.sampler.should_sample())
+        request.timing = timing
+
+        if timing.sampled:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timing))
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+
+        finished = time.perf_counter()
+        timing.total = finished - timing.started
+        if self.send_header:
+            response['Server-Timing'] = timing.header()
+        self._log(request, response, timing)
+        if timing.sampled:
+            timing.overhead += time.perf_counter() - finished
+            self.sampler.record(timing.overhead, timing.total)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF Response được render sau bước này; callback đo thời gian render.
+        # Response đã render sẵn (cache_response render trong view) tự ghi render_time
+        timing = getattr(request, 'timing', None)
+        if timing is not None and not response.is_rendered:
+            timing.render_started = time.perf_counter()
+            response.add_post_render_callback(lambda r: self._rendered(timing))
+        return response
+
+    @staticmethod
+    def _rendered(timing):
+        if timing.render_started is not None:
+            timing.render_time = time.perf_counter() - timing.render_started
+
+    def _log(self, request, response, timing):
+        slow = timing.total >= self.slow_request
+        level = logging.WARNING if slow else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        resolver_match = getattr(request, 'resolver_match', None)
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'view': resolver_match.view_name if resolver_match else None,
+            'status': response.status_code,
+            **timing.as_fields(),
+        }
+        if slow and timing.sampled:
+            fields['top_queries'] = timing.top_queries()
+        # Field vừa nằm trong record.timing (cho formatter JSON) vừa in kèm message
+        logger.log(
+            level, '%s %s %s %.1fms%s %s', request.method, request.path, response.status_code,
+            timing.total * 1000, ' (slow)' if slow else '', json.dumps(fields, ensure_ascii=False),
+            extra={'timing': fields}
+        )
@@ -4,10 +4,10 @@ from .models import Product
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ['id', 'name', 'category', 'price', 'created_at', 'updated_at']
+    list_display = ['id', 'name', 'category', 'price', 'stock', 'created_at', 'updated_at']
     list_filter = ['category', 'created_at', 'updated_at']
     search_fields = ['name', 'description']
-    list_editable = ['price']
+    list_editable = ['price', 'stock']
     list_per_page = 20
     
     fieldsets = (
@@ -15,7 +15,7 @@ class ProductAdmin(admin.ModelAdmin):
             'fields': ('name', 'description', 'category')
         }),
         ('Giá và hình ảnh', {
-            'fields': ('price', 'image')
+            'fields': ('price', 'stock', 'image')
         }),
         ('Thời gian', {
             'fields': ('created_at', 'updated_at'),
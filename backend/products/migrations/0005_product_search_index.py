@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:30
+
+import unicodedata
+
+from django.db import migrations
+
+# DDL và hàm bỏ dấu được chép cố định vào migration (không import products.search)
+# để thay đổi code của app sau này không làm đổi lịch sử migration.
+FTS_TABLE = 'products_product_fts'
+PG_TABLE = 'products_product_search'
+
+
+def fold(text):
+    text = (text or '').replace('đ', 'd').replace('Đ', 'D')
+    decomposed = unicodedata.normalize('NFD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            f"USING fts5(name, description, tokenize='unicode61')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {PG_TABLE} ("
+            f"product_id bigint PRIMARY KEY REFERENCES products_product(id) ON DELETE CASCADE "
+            f"DEFERRABLE INITIALLY DEFERRED, document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {PG_TABLE}_document_idx ON {PG_TABLE} USING GIN (document)"
+        )
+    else:
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT id, name, description FROM products_product")
+        for product_id, name, description in cursor.fetchall():
+            if vendor == 'sqlite':
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (%s, %s, %s)",
+                    [product_id, fold(name), fold(description)]
+                )
+            else:
+                cursor.execute(
+                    f"INSERT INTO {PG_TABLE} (product_id, document) VALUES (%s, "
+                    f"setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B'))",
+                    [product_id, fold(name), fold(description)]
+                )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == 'postgresql':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {PG_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='stock',
+            field=models.PositiveIntegerField(blank=True, help_text='Để trống nếu không theo dõi tồn kho', null=True, verbose_name='Tồn kho'),
+        ),
+    ]
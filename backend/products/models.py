@@ -14,7 +14,12 @@ class Product(models.Model):
     description = models.TextField(verbose_name="Mô tả")
     price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Giá")
     image = models.ImageField(upload_to='products/', verbose_name="Hình ảnh")
+    image_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Ảnh phái sinh")
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, verbose_name="Danh mục")
+    stock = models.PositiveIntegerField(
+        blank=True, null=True, verbose_name="Tồn kho",
+        help_text="Để trống nếu không theo dõi tồn kho"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -22,6 +27,10 @@ class Product(models.Model):
         verbose_name = "Sản phẩm"
         verbose_name_plural = "Sản phẩm"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', 'id'], name='product_created_id_idx'),
+            models.Index(fields=['category', '-created_at', 'id'], name='product_cat_created_id_idx'),
+        ]
     
     def __str__(self):
         return self.name
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Chỉ mục tìm kiếm toàn văn cho Product.
+
+- SQLite: bảng ảo FTS5 `products_product_fts` (rowid = product id), xếp hạng bằng bm25.
+- PostgreSQL: bảng `products_product_search` với cột tsvector + GIN index, xếp hạng bằng ts_rank.
+
+Văn bản được bỏ dấu tiếng Việt (fold) trước khi đưa vào chỉ mục và trước khi
+tìm, nên "may tam nuoc" khớp với "Máy tăm nước". Chỉ mục được cập nhật từng
+dòng qua signal post_save/post_delete (xem products/signals.py). Bảng chỉ mục
+được tạo bởi migration products/0005_product_search_index.
+"""
+import re
+
+from django.db import connection, transaction
+
+from metadent_backend.text import fold
+
+FTS_TABLE = 'products_product_fts'
+PG_TABLE = 'products_product_search'
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+REBUILD_BATCH_SIZE = 2000
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    return _TOKEN_RE.findall(fold(query))
+
+
+def is_supported():
+    return connection.vendor in ('sqlite', 'postgresql')
+
+
+# --- incremental updates ----------------------------------------------------
+
+def _write(cursor, product_id, name, description):
+    vendor = cursor.db.vendor
+    if vendor == 'sqlite':
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [product_id])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (%s, %s, %s)",
+            [product_id, fold(name), fold(description)]
+        )
+    elif vendor == 'postgresql':
+        cursor.execute(
+            f"INSERT INTO {PG_TABLE} (product_id, document) VALUES (%s, "
+            f"setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B')) "
+            f"ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document",
+            [product_id, fold(name), fold(description)]
+        )
+
+
+def index_product(product):
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        _write(cursor, product.pk, product.name, product.description)
+
+
+def unindex_product(product_id):
+    if not is_supported():
+        return
+    table, column = (FTS_TABLE, 'rowid') if connection.vendor == 'sqlite' else (PG_TABLE, 'product_id')
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {column} = %s", [product_id])
+
+
+def _insert_many(cursor, rows):
+    params = [(product_id, fold(name), fold(description)) for product_id, name, description in rows]
+    if cursor.db.vendor == 'sqlite':
+        cursor.executemany(f"INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (%s, %s, %s)", params)
+    else:
+        cursor.executemany(
+            f"INSERT INTO {PG_TABLE} (product_id, document) VALUES (%s, "
+            f"setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B')) "
+            f"ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document",
+            params
+        )
+
+
+def rebuild_index(db_connection=None, batch_size=REBUILD_BATCH_SIZE):
+    """
+    Xây lại toàn bộ chỉ mục từ bảng products_product (dùng sau bulk import).
+    Đọc theo từng lô `batch_size` dòng (keyset theo id, không nạp cả bảng vào
+    bộ nhớ), mỗi lô ghi trong một transaction.
+    """
+    db_connection = db_connection or connection
+    if db_connection.vendor not in ('sqlite', 'postgresql'):
+        return 0
+    table = FTS_TABLE if db_connection.vendor == 'sqlite' else PG_TABLE
+    with transaction.atomic(using=db_connection.alias), db_connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table}")
+
+    count, last_id = 0, 0
+    while True:
+        with transaction.atomic(using=db_connection.alias), db_connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT id, name, description FROM products_product WHERE id > %s ORDER BY id LIMIT %s",
+                [last_id, batch_size]
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return count
+            _insert_many(cursor, rows)
+        count += len(rows)
+        last_id = rows[-1][0]
+
+
+# --- query ------------------------------------------------------------------
+
+def search_product_ids(query, limit=20):
+    """
+    Trả về danh sách id sản phẩm đã xếp hạng (liên quan nhất trước).
+    Mỗi từ được tìm theo tiền tố và mọi từ đều phải khớp.
+    """
+    tokens = tokenize(query)
+    if not tokens or not is_supported():
+        return []
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            match = ' '.join(f'"{token}"*' for token in tokens)
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY bm25({FTS_TABLE}, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT}), rowid LIMIT %s",
+                [match, limit]
+            )
+        else:
+            tsquery = ' & '.join(f'{token}:*' for token in tokens)
+            cursor.execute(
+                f"SELECT product_id FROM {PG_TABLE}, to_tsquery('simple', %s) AS query "
+                f"WHERE document @@ query "
+                # Trọng số mặc định của ts_rank: A (name) = 1.0, B (description) = 0.4
+                f"ORDER BY ts_rank(document, query) DESC, product_id "
+                f"LIMIT %s",
+                [tsquery, limit]
+            )
+        return [row[0] for row in cursor.fetchall()]
@@ -1,9 +1,15 @@
 from rest_framework import serializers
+from metadent_backend.images import build_srcset
 from .models import Product
 
 
 class ProductSerializer(serializers.ModelSerializer):
+    image_srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = Product
-        fields = ['id', 'name', 'description', 'price', 'image', 'category', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'description', 'price', 'image', 'image_srcset', 'category', 'stock', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+
+    def get_image_srcset(self, obj):
+        return build_srcset(obj.image_variants, obj.image.storage, self.context.get('request'))
@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from jobs.queue import enqueue
+from metadent_backend.caching import invalidate_models
+from metadent_backend.images import variants_outdated
+from . import search
+from .models import Product
+
+
+@receiver(post_save, sender=Product)
+def generate_product_variants(sender, instance, raw=False, **kwargs):
+    if not raw and variants_outdated(instance):
+        enqueue('metadent_backend.images.generate_variants_task', model='products.Product', pk=instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product_cache(sender, **kwargs):
+    invalidate_models(Product)
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_product(instance)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    search.unindex_product(instance.pk)
@@ -1,3 +1,538 @@
-from django.test import TestCase
+import io
+import re
+import shutil
+import tempfile
+import threading
+import time as time_module
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from django.db import connection
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from PIL import Image
+
+from jobs.models import Job
+from jobs.queue import run_pending
+from metadent_backend.caching import response_cache, response_key, row_tag
+from metadent_backend.renderers import FastJSONParser, FastJSONRenderer
+from metadent_backend.timing import AdaptiveSampler
+from .models import Product
+
+
+def make_product(name='Sản phẩm', category='water_flosser', price='100000', **kwargs):
+    return Product.objects.create(
+        name=name,
+        description=kwargs.pop('description', f'Mô tả {name}'),
+        price=Decimal(price),
+        image=kwargs.pop('image', 'products/test.jpg'),
+        category=category,
+        **kwargs
+    )
+
+
+class ProductKeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        now = timezone.now()
+        self.products = []
+        for i in range(7):
+            product = make_product(name=f'Sản phẩm {i}', category='water_flosser' if i % 2 else 'mouthwash')
+            # Two rows share created_at to exercise the id tie-breaker
+            Product.objects.filter(pk=product.pk).update(created_at=now - timedelta(minutes=i // 2))
+            self.products.append(product)
+
+    def collect(self, url, page_size):
+        ids = []
+        response = self.client.get(url, {'cursor': '', 'page_size': page_size})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_without_cursor_returns_plain_list(self):
+        response = self.client.get(reverse('product-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 7)
+
+    def test_pages_follow_created_at_then_id(self):
+        expected = list(
+            Product.objects.order_by('-created_at', 'id').values_list('id', flat=True)
+        )
+        self.assertEqual(self.collect(reverse('product-list'), 2), expected)
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(reverse('product-list'), {'cursor': '', 'page_size': 10000})
+        self.assertEqual(len(response.data['results']), 7)
+        self.assertIsNone(response.data['next'])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('product-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_category_endpoint_paginates(self):
+        url = reverse('products-by-category', args=['water_flosser'])
+        expected = list(
+            Product.objects.filter(category='water_flosser')
+            .order_by('-created_at', 'id').values_list('id', flat=True)
+        )
+        self.assertEqual(self.collect(url, 1), expected)
+        self.assertIsInstance(self.client.get(url).data, list)
+
+
+class ProductImageVariantTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def upload(self, width=1200, height=600, name='anh.png', fmt='PNG'):
+        buffer = io.BytesIO()
+        Image.new('RGB', (width, height), (200, 30, 30)).save(buffer, fmt)
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{fmt.lower()}')
+
+    def test_variants_generated_by_background_job(self):
+        product = make_product(image=self.upload())
+        self.assertEqual(product.image_variants, {})
+        self.assertEqual(run_pending(), 1)
+        product.refresh_from_db()
+        self.assertEqual(product.image_variants['source'], product.image.name)
+        self.assertEqual(sorted(product.image_variants['webp'], key=int), ['320', '640', '1024', '1200'])
+        with product.image.storage.open(product.image_variants['jpeg']['640']) as fh:
+            self.assertEqual(Image.open(fh).size, (640, 320))
+
+        response = self.client.get(reverse('product-detail', args=[product.pk]))
+        self.assertIn('640w', response.data['image_srcset']['webp'])
+
+    def test_small_image_keeps_original_width(self):
+        product = make_product(image=self.upload(width=200, height=100))
+        run_pending()
+        product.refresh_from_db()
+        self.assertEqual(list(product.image_variants['jpeg']), ['200'])
+
+    def test_same_stem_different_extension_keeps_separate_variants(self):
+        png = make_product(image=self.upload(width=400, height=200))
+        jpg = make_product(image=self.upload(width=300, height=200, name='anh.jpg', fmt='JPEG'))
+        run_pending()
+        png.refresh_from_db()
+        jpg.refresh_from_db()
+        self.assertNotEqual(png.image_variants['webp'], jpg.image_variants['webp'])
+        with png.image.storage.open(png.image_variants['webp']['400']) as fh:
+            self.assertEqual(Image.open(fh).size, (400, 200))
+        with jpg.image.storage.open(jpg.image_variants['webp']['300']) as fh:
+            self.assertEqual(Image.open(fh).size, (300, 200))
+
+    def test_generated_variants_change_validators(self):
+        product = make_product(image=self.upload())
+        url = reverse('product-detail', args=[product.pk])
+        first = self.client.get(url)
+        self.assertEqual(first.json()['image_srcset'], {})
+
+        run_pending()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('640w', response.json()['image_srcset']['webp'])
+
+    def test_failed_generation_is_retried_by_queue(self):
+        product = make_product()  # products/test.jpg không tồn tại trong storage
+        run_pending()
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), ('pending', 1))
+        self.assertIn('products/test.jpg', job.last_error)
+        product.refresh_from_db()
+        self.assertEqual(product.image_variants, {})
+
+    def test_destroy_defers_file_cleanup(self):
+        product = make_product(image=self.upload())
+        run_pending()
+        product.refresh_from_db()
+        storage = product.image.storage
+        files = [product.image.name, product.image_variants['webp']['320']]
+
+        response = self.client.delete(reverse('product-detail', args=[product.pk]))
+        self.assertEqual(response.status_code, 204)
+        self.assertTrue(all(storage.exists(name) for name in files))
+        self.assertEqual(Job.objects.count(), 1)
+
+        run_pending()
+        self.assertFalse(any(storage.exists(name) for name in files))
+
+
+class ProductConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.product = make_product(name='Máy tăm nước')
+
+    def test_unchanged_list_returns_304_without_serializing(self):
+        url = reverse('product-list')
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        # Validator lấy từ response cache, không cần query aggregate
+        with self.assertNumQueries(0):
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+
+    def test_change_invalidates_etag(self):
+        url = reverse('products-by-category', args=['water_flosser'])
+        etag = self.client.get(url)['ETag']
+        self.product.price = Decimal('120000')
+        self.product.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.client.get(url)['ETag']
+        self.product.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_ignores_if_modified_since_after_delete(self):
+        url = reverse('product-list')
+        older = make_product(name='Bàn chải điện')
+        Product.objects.filter(pk=older.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        first = self.client.get(url)
+        self.assertFalse(first.has_header('Last-Modified'))
+
+        older.delete()
+        since = self.client.get(reverse('product-detail', args=[self.product.pk]))['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['name'] for item in response.json()], ['Máy tăm nước'])
+
+    def test_detail_supports_if_modified_since(self):
+        url = reverse('product-detail', args=[self.product.pk])
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.get(reverse('product-detail', args=[999999])).status_code, 404)
+
+
+class ProductResponseCacheTests(TestCase):
+    def setUp(self):
+        response_cache.clear()
+        self.client = APIClient()
+        self.product = make_product(name='Máy tăm nước', stock=5)
+
+    def names(self, response):
+        return [item['name'] for item in response.json()]
+
+    def test_hot_read_skips_database(self):
+        url = reverse('product-list')
+        first = self.client.get(url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+        # Process khác (LRU rỗng) đọc từ tầng dùng chung
+        response_cache.local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).content, first.content)
+
+    def test_save_and_delete_invalidate(self):
+        url = reverse('product-list')
+        self.client.get(url)
+        self.product.name = 'Máy tăm nước mới'
+        self.product.save()
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(self.names(response), ['Máy tăm nước mới'])
+
+        detail = reverse('product-detail', args=[self.product.pk])
+        self.assertEqual(self.client.get(detail).status_code, 200)
+        self.product.delete()
+        self.assertEqual(self.client.get(detail).status_code, 404)
+        self.assertEqual(self.names(self.client.get(url)), [])
+
+    def test_stock_reservation_invalidates(self):
+        from cart.inventory import lock_products, reserve_stock
+
+        url = reverse('product-detail', args=[self.product.pk])
+        self.assertEqual(self.client.get(url).json()['stock'], 5)
+        reserve_stock(lock_products([self.product.pk]), {self.product.pk: 2})
+        self.assertEqual(self.client.get(url).json()['stock'], 3)
+
+    def test_stock_reservation_keeps_unrelated_entries(self):
+        from cart.inventory import lock_products, reserve_stock
+
+        other = make_product(name='Bàn chải điện', stock=7)
+        other_url = reverse('product-detail', args=[other.pk])
+        url = reverse('product-detail', args=[self.product.pk])
+        self.client.get(other_url)
+        self.client.get(url)
+        self.client.get(reverse('product-list'))
+
+        reserve_stock(lock_products([self.product.pk]), {self.product.pk: 2})
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(other_url)['X-Cache'], 'HIT')
+            # Danh sách chỉ theo tag model: checkout không làm mới danh sách
+            self.assertEqual(self.client.get(reverse('product-list'))['X-Cache'], 'HIT')
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['stock'], 3)
+
+    def test_lists_do_not_register_row_tags(self):
+        self.client.get(reverse('product-list'))
+        self.assertIsNone(response_cache.shared.get(f'tag:{row_tag(Product, self.product.pk)}'))
+        self.client.get(reverse('product-detail', args=[self.product.pk]))
+        self.assertIsNotNone(response_cache.shared.get(f'tag:{row_tag(Product, self.product.pk)}'))
+
+    def test_reservation_committed_while_rendering_is_not_cached_as_current(self):
+        from cart.inventory import lock_products, reserve_stock
+        from .serializers import ProductSerializer
+
+        url = reverse('product-detail', args=[self.product.pk])
+        original = ProductSerializer.to_representation
+
+        def reserve_while_rendering(serializer, instance):
+            # Checkout khác commit sau khi view đã đọc sản phẩm
+            reserve_stock(lock_products([instance.pk]), {instance.pk: 2})
+            return original(serializer, instance)
+
+        with mock.patch.object(ProductSerializer, 'to_representation', reserve_while_rendering):
+            self.assertEqual(self.client.get(url).json()['stock'], 5)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['stock'], 3)
+
+    def test_writes_are_not_cached(self):
+        url = reverse('product-detail', args=[self.product.pk])
+        self.client.get(url)
+        response = self.client.patch(url, {'stock': 9}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('X-Cache'))
+        self.assertEqual(self.client.get(url).json()['stock'], 9)
+
+
+class ProductCacheStampedeTests(TransactionTestCase):
+    """
+    Entry hết hạn / bị invalidate khi nhiều request cùng đến: chỉ một request
+    tính lại, các request khác chờ bản đầu tiên hoặc nhận bản cũ.
+    """
+    THREADS = 8
+
+    def setUp(self):
+        response_cache.clear()
+        for i in range(5):
+            make_product(name=f'Sản phẩm {i}')
+        self.url = reverse('product-list')
+        self.product_queries = []
+        self.lock = threading.Lock()
+
+    def record(self, execute, sql, params, many, context):
+        if 'products_product' in sql:
+            with self.lock:
+                self.product_queries.append(sql)
+        # Request đang tính lại chậm một chút để các request khác chắc chắn đến trong lúc đó
+        time_module.sleep(0.02)
+        return execute(sql, params, many, context)
+
+    def get(self, barrier=None):
+        client = APIClient()
+        try:
+            if barrier:
+                barrier.wait()
+            with connection.execute_wrapper(self.record):
+                return client.get(self.url)
+        finally:
+            connection.close()
+
+    def test_burst_hits_database_once(self):
+        self.get()
+        expected = len(self.product_queries)
+        self.assertGreater(expected, 0)
+        response_cache.clear()
+        self.product_queries.clear()
+
+        barrier = threading.Barrier(self.THREADS)
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            responses = list(executor.map(self.get, [barrier] * self.THREADS))
+
+        self.assertEqual(len(self.product_queries), expected)
+        self.assertEqual([response.status_code for response in responses], [200] * self.THREADS)
+        self.assertEqual(len({response.content for response in responses}), 1)
+        self.assertEqual(sorted(response['X-Cache'] for response in responses), ['HIT'] * 7 + ['MISS'])
+
+    def test_stale_value_served_while_another_request_refreshes(self):
+        with mock.patch.object(response_cache, 'timeout', 0.05):
+            old = self.get().content
+        time_module.sleep(0.1)
+
+        # Entry hết hạn theo thời gian, một worker khác đang giữ khóa tính lại
+        key = response_key(RequestFactory().get(self.url))
+        token = response_cache._acquire(key)
+        self.assertIsNotNone(token)
+        self.product_queries.clear()
+        stale = self.get()
+        self.assertEqual(stale['X-Cache'], 'STALE')
+        self.assertEqual(stale.content, old)
+        self.assertEqual(self.product_queries, [])
+
+        response_cache._release(key, token)
+        self.assertEqual(self.get()['X-Cache'], 'MISS')
+
+    def test_invalidated_value_is_never_served_stale(self):
+        self.get()
+        Product.objects.filter(name='Sản phẩm 0').get().delete()
+
+        key = response_key(RequestFactory().get(self.url))
+        token = response_cache._acquire(key)
+        self.assertIsNotNone(token)
+        # Bên giữ khóa không ghi được entry mới: request chờ hết hạn rồi tự tính
+        with mock.patch.object(response_cache, 'lock_wait', 0.1):
+            response = self.get()
+        response_cache._release(key, token)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.json()), 4)
+
+    def test_early_probabilistic_refresh(self):
+        self.get()
+        self.assertEqual(self.get()['X-Cache'], 'HIT')
+        # beta rất lớn: mọi request đều refresh sớm dù entry còn hạn
+        with mock.patch.object(response_cache, 'beta', 10 ** 9):
+            self.assertEqual(self.get()['X-Cache'], 'MISS')
+
+
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.flosser = make_product(
+            name='Máy tăm nước Waterpulse', description='Làm sạch kẽ răng', category='water_flosser'
+        )
+        self.brush = make_product(
+            name='Bàn chải điện', description='Dùng kèm máy tăm nước để làm sạch', category='electric_brush'
+        )
+        self.mouthwash = make_product(name='Nước súc miệng Đức', description='Hơi thở thơm mát', category='mouthwash')
+
+    def search(self, q):
+        response = self.client.get(reverse('product-search'), {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.data]
+
+    def test_accent_insensitive_and_ranked_by_name(self):
+        self.assertEqual(self.search('may tam nuoc'), [self.flosser.id, self.brush.id])
+
+    def test_prefix_and_d_folding(self):
+        self.assertEqual(self.search('suc mieng duc'), [self.mouthwash.id])
+        self.assertEqual(self.search('waterp'), [self.flosser.id])
+
+    def test_index_follows_save_and_delete(self):
+        self.mouthwash.name = 'Nước súc miệng bạc hà'
+        self.mouthwash.save()
+        self.assertEqual(self.search('bac ha'), [self.mouthwash.id])
+        self.assertEqual(self.search('duc'), [])
+
+        self.flosser.delete()
+        self.assertEqual(self.search('may tam nuoc'), [self.brush.id])
+
+    def test_rebuild_index_in_batches(self):
+        from . import search
+
+        extra = [make_product(name=f'Máy tăm nước mini {i}') for i in range(4)]
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {search.FTS_TABLE}")
+        self.assertEqual(search.search_product_ids('mini'), [])
+        self.assertEqual(search.rebuild_index(batch_size=2), 7)
+        self.assertEqual(sorted(search.search_product_ids('mini')), [product.id for product in extra])
+        self.assertEqual(search.search_product_ids('suc mieng'), [self.mouthwash.id])
+
+    def test_empty_query(self):
+        self.assertEqual(self.search('  '), [])
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        make_product('Máy tăm nước')
+
+    def test_header_reports_db_and_render(self):
+        response = self.client.get(reverse('product-list'))
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertRegex(timing, r'render;dur=[\d.]+')
+        self.assertRegex(timing, r'total;dur=[\d.]+$')
+
+    def test_cached_view_reports_render_time_on_miss(self):
+        response_cache.clear()
+        for i in range(20):
+            make_product(f'Bàn chải điện {i}')
+        response = self.client.get(reverse('product-list'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        render = re.search(r'render;dur=([\d.]+)', response['Server-Timing'])
+        self.assertIsNotNone(render)
+        self.assertGreater(float(render.group(1)), 0)
+
+    @override_settings(SLOW_REQUEST_MS=0)
+    def test_slow_request_logs_top_queries(self):
+        with self.assertLogs('metadent_backend.timing', 'WARNING') as logs:
+            self.client.get(reverse('product-list'))
+        fields = logs.records[0].timing
+        self.assertEqual(fields['view'], 'product-list')
+        self.assertGreater(fields['db_queries'], 0)
+        self.assertIn('products_product', fields['top_queries'][0]['sql'])
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_request_skips_db_timing(self):
+        response = self.client.get(reverse('product-list'))
+        self.assertNotIn('db;', response['Server-Timing'])
+        self.assertIn('total;dur=', response['Server-Timing'])
+
+    def test_sampler_backs_off_when_over_budget(self):
+        sampler = AdaptiveSampler(rate=1.0, budget=0.02)
+        for _ in range(sampler.WINDOW):
+            sampler.record(overhead=0.01, elapsed=0.1)
+        self.assertEqual(sampler.rate, 0.5)
+        for _ in range(sampler.WINDOW):
+            sampler.record(overhead=0.0, elapsed=0.1)
+        self.assertEqual(sampler.rate, 0.625)
+
+
+class FastJSONTests(TestCase):
+    def test_output_matches_drf_renderer(self):
+        make_product('Bàn chải điện', image_variants={'webp': {'320': 'products/a_320.webp'}}, image='products/a.jpg')
+        response = APIClient().get(reverse('product-list'))
+        data = {
+            'products': response.data,
+            'price': Decimal('1290000.50'),
+            'utc': datetime(2026, 1, 2, 3, 4, 5, 123456, tzinfo=dt_timezone.utc),
+            'ict': datetime(2026, 1, 2, 10, 4, 5, tzinfo=dt_timezone(timedelta(hours=7))),
+            'naive': datetime(2026, 1, 2, 3, 4, 5),
+            'day': date(2026, 1, 2),
+            'time': time(8, 30, 15, 250000),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'lazy': gettext_lazy('Sản phẩm'),
+            'separators': 'a\u2028b\u2029c',
+            1: 'non-string key',
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertIn(b'2026-01-02T03:04:05.123456Z', FastJSONRenderer().render(data))
+
+    def test_indent_falls_back_to_drf(self):
+        data = {'a': [1, 2]}
+        media_type = 'application/json; indent=2'
+        self.assertEqual(FastJSONRenderer().render(data, media_type), JSONRenderer().render(data, media_type))
+
+    def test_parser(self):
+        parser = FastJSONParser()
+        self.assertEqual(parser.parse(io.BytesIO('{"tên": [1, 2.5]}'.encode())), {'tên': [1, 2.5]})
+        self.assertEqual(parser.parse(io.BytesIO(b'{"n": 123456789012345678901234567890}')),
+                         {'n': 123456789012345678901234567890})
+        with self.assertRaisesMessage(ParseError, 'JSON parse error'):
+            parser.parse(io.BytesIO(b'{"a": '))
@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path('', views.ProductListAPIView.as_view(), name='product-list'),
+    path('search/', views.search_products, name='product-search'),
     path('<int:pk>/', views.ProductDetailAPIView.as_view(), name='product-detail'),
     path('category/<str:category>/', views.products_by_category, name='products-by-category'),
 ]
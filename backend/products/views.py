@@ -3,15 +3,22 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from .models import Product
 from .serializers import ProductSerializer
-import os
+from . import search
+from metadent_backend.pagination import KeysetPagination
+from metadent_backend.caching import CacheResponseMixin, cache_response
+from metadent_backend.conditional import ConditionalGetMixin, conditional_response
+from metadent_backend.images import variant_names
+from jobs.queue import enqueue
 
 
-class ProductListAPIView(generics.ListCreateAPIView):
+class ProductListAPIView(CacheResponseMixin, ConditionalGetMixin, generics.ListCreateAPIView):
     """
     List all products or create a new product
     """
+    cache_tags = (Product,)
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         queryset = Product.objects.all()
@@ -21,25 +28,59 @@ class ProductListAPIView(generics.ListCreateAPIView):
         return queryset
 
 
-class ProductDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class ProductDetailAPIView(CacheResponseMixin, ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update or delete a product
     """
+    cache_tags = (Product,)
+    # Trừ kho khi checkout chỉ invalidate trang chi tiết của sản phẩm đó
+    cache_row_model = Product
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        # Delete associated image file
-        if instance.image:
-            if os.path.isfile(instance.image.path):
-                os.remove(instance.image.path)
+        files = [name for name in [instance.image.name, *variant_names(instance.image_variants)] if name]
         self.perform_destroy(instance)
+        # Xóa file ảnh ở worker nền để response trả về ngay
+        if files:
+            enqueue('metadent_backend.images.delete_files_task', names=files)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@cache_response((Product,))
 @api_view(['GET'])
 def products_by_category(request, category):
     products = Product.objects.filter(category=category)
-    serializer = ProductSerializer(products, many=True)
-    return Response(serializer.data)
\ No newline at end of file
+
+    def render():
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(products, request)
+        if page is not None:
+            serializer = ProductSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+        serializer = ProductSerializer(products, many=True)
+        return Response(serializer.data)
+
+    return conditional_response(request, products, render)
+
+
+@cache_response((Product,))
+@api_view(['GET'])
+def search_products(request):
+    """
+    Tìm kiếm toàn văn, không phân biệt dấu: /api/products/search/?q=may tam nuoc
+    """
+    query = request.query_params.get('q', '').strip()
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 50)
+    except ValueError:
+        limit = 20
+    if not query:
+        return Response([])
+
+    ids = search.search_product_ids(query, limit=limit)
+    products = Product.objects.in_bulk(ids)
+    ranked = [products[pk] for pk in ids if pk in products]
+    serializer = ProductSerializer(ranked, many=True, context={'request': request})
+    return Response(serializer.data)
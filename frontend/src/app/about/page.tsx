@@ -15,7 +15,7 @@ export default function AboutPage() {
       try {
         const [settingsMap, images] = await Promise.all([
           cmsApi.getAllSiteSettingsMap(),
-          cmsApi.getPageImages()
+          cmsApi.getPageImages({ is_active: true })
         ]);
         setSettings(settingsMap);
         setPageImages(images);
@@ -1,6 +1,6 @@
 'use client';
 
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import Link from 'next/link';
 import { Minus, Plus, Trash2, ShoppingBag, ArrowLeft, X } from 'lucide-react';
 import { CartItem } from '@/types';
@@ -62,6 +62,8 @@ export default function CartPage() {
     address: false,
   });
   const [submitting, setSubmitting] = useState(false);
+  // Một key cho mỗi lần đặt hàng, giữ nguyên khi người dùng bấm lại sau lỗi mạng
+  const checkoutKey = useRef<string | null>(null);
 
   const { clearCart, fetchItems, removeItem, updateQuantity } = useCartStore();
 
@@ -286,13 +288,18 @@ export default function CartPage() {
         quantity: item.quantity,
       }));
 
+      if (!checkoutKey.current) {
+        checkoutKey.current = crypto.randomUUID();
+      }
+
       const order = await orderApi.create({
         cart_items: cartItemsForOrder,
         customer: {
           ...orderData,
           customer_address: fullAddress,
         },
-      });
+      }, checkoutKey.current);
+      checkoutKey.current = null;
       
       await clearCart();
       setCartItems([]);
@@ -342,6 +349,11 @@ export default function CartPage() {
       });
     } catch (error) {
       console.error('Error creating order:', error);
+      // Backend đã trả lời (vd. 4xx): lần gửi sau là một request mới, cần key mới
+      const responseStatus = (error as { response?: { status: number } }).response?.status;
+      if (responseStatus !== undefined && responseStatus < 500) {
+        checkoutKey.current = null;
+      }
       Swal.fire({
         title: '❌ Lỗi đặt hàng',
         text: 'Có lỗi xảy ra khi đặt hàng. Vui lòng kiểm tra thông tin và thử lại.',
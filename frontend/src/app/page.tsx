@@ -21,7 +21,7 @@ export default function HomePage() {
       try {
         const [products, images, settingsMap] = await Promise.all([
           productsApi.getAll(),
-          cmsApi.getPageImages(),
+          cmsApi.getPageImages({ is_active: true }),
           cmsApi.getAllSiteSettingsMap()
         ]);
         
@@ -1,6 +1,8 @@
 import axios from 'axios';
 
-// API endpoint cho địa chỉ Việt Nam
+// Dữ liệu địa chỉ được phục vụ từ backend (bộ nhớ, cache lâu dài)
+const LOCAL_API_URL = 'http://localhost:8000/api/address';
+// API bên ngoài chỉ dùng khi backend chưa có dữ liệu cấp tương ứng
 const API_BASE_URL = 'https://provinces.open-api.vn/api';
 
 export interface AddressOption {
@@ -32,6 +34,26 @@ const cache = {
   wards: {} as Record<string, AddressOption[]>,
 };
 
+const toOptions = (items: Array<{ code: number; name: string }>): AddressOption[] =>
+  items.map((item) => ({ value: item.code.toString(), label: item.name }));
+
+// Version của dataset backend (header X-Address-Dataset-Version); URL kèm ?v= được cache lâu dài
+let datasetVersion: string | null = null;
+
+// Trả về null nếu backend lỗi hoặc chưa nạp dữ liệu cho cấp này
+const fetchLocal = async (path: string): Promise<AddressOption[] | null> => {
+  try {
+    const response = await axios.get(`${LOCAL_API_URL}${path}`, {
+      params: datasetVersion ? { v: datasetVersion } : undefined,
+    });
+    datasetVersion = response.headers['x-address-dataset-version'] ?? datasetVersion;
+    return response.data.length ? toOptions(response.data) : null;
+  } catch (error) {
+    console.error('Error fetching local address data:', error);
+    return null;
+  }
+};
+
 export const addressApi = {
   // Lấy danh sách tỉnh/thành phố
   getProvinces: async (): Promise<AddressOption[]> => {
@@ -40,14 +62,9 @@ export const addressApi = {
     }
 
     try {
-      const response = await axios.get(`${API_BASE_URL}/p/`);
-      console.log('API Response:', response.data.slice(0, 3)); // Log first 3 items
-      const provinces = response.data.map((province: Province) => ({
-        value: province.code.toString(),
-        label: province.name,
-      }));
-      
-      console.log('Mapped provinces:', provinces.slice(0, 3)); // Log first 3 mapped items
+      const provinces = (await fetchLocal('/provinces/')) ?? toOptions(
+        (await axios.get(`${API_BASE_URL}/p/`)).data as Province[]
+      );
       cache.provinces = provinces;
       return provinces;
     } catch (error) {
@@ -70,11 +87,9 @@ export const addressApi = {
     }
 
     try {
-      const response = await axios.get(`${API_BASE_URL}/p/${provinceCode}?depth=2`);
-      const districts = response.data.districts.map((district: District) => ({
-        value: district.code.toString(),
-        label: district.name,
-      }));
+      const districts = (await fetchLocal(`/provinces/${provinceCode}/districts/`)) ?? toOptions(
+        (await axios.get(`${API_BASE_URL}/p/${provinceCode}?depth=2`)).data.districts as District[]
+      );
       
       cache.districts[provinceCode] = districts;
       return districts;
@@ -91,11 +106,9 @@ export const addressApi = {
     }
 
     try {
-      const response = await axios.get(`${API_BASE_URL}/d/${districtCode}?depth=2`);
-      const wards = response.data.wards.map((ward: Ward) => ({
-        value: ward.code.toString(),
-        label: ward.name,
-      }));
+      const wards = (await fetchLocal(`/districts/${districtCode}/wards/`)) ?? toOptions(
+        (await axios.get(`${API_BASE_URL}/d/${districtCode}?depth=2`)).data.wards as Ward[]
+      );
       
       cache.wards[districtCode] = wards;
       return wards;
@@ -107,6 +120,15 @@ export const addressApi = {
 
   // Lấy tên địa chỉ theo code
   getAddressName: async (provinceCode: string, districtCode?: string, wardCode?: string): Promise<string> => {
+    try {
+      const response = await axios.get(`${LOCAL_API_URL}/resolve/`, {
+        params: { province: provinceCode, district: districtCode, ward: wardCode },
+      });
+      return response.data.full_name;
+    } catch (error) {
+      console.error('Error resolving local address name:', error);
+    }
+
     try {
       let address = '';
       
@@ -28,6 +28,11 @@ export const productsApi = {
     return response.data;
   },
 
+  search: async (q: string): Promise<Product[]> => {
+    const response = await api.get('/products/search/', { params: { q } });
+    return response.data;
+  },
+
   // Admin endpoints
   create: async (formData: FormData): Promise<Product> => {
     const response = await axios.post(`${API_BASE_URL}/products/`, formData, {
@@ -70,9 +75,12 @@ export const orderApi = {
       customer_phone: string;
       customer_address: string;
     };
-  }): Promise<Order> => {
+  }, idempotencyKey?: string): Promise<Order> => {
     console.log('API: Creating order', orderData);
-    const response = await api.post('/cart/order/', orderData);
+    // Gửi lại cùng key khi retry để backend không tạo đơn hàng trùng
+    const response = await api.post('/cart/order/', orderData, {
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : undefined,
+    });
     console.log('API: Order response', response.data);
     return response.data;
   },
@@ -7,6 +7,7 @@ export interface PageImage {
   name: string;
   position: string;
   image: string;
+  image_srcset?: Record<string, string>;
   link_url?: string;
   is_active: boolean;
   created_at: string;
@@ -21,16 +22,36 @@ export interface SiteSetting {
   category: string;
 }
 
+export interface CmsBootstrap {
+  settings: Record<string, string>;
+  page_images: Record<string, PageImage[]>;
+}
+
+// One request per page load, shared by every helper below
+let bootstrapPromise: Promise<CmsBootstrap> | null = null;
+
 export const cmsApi = {
-  getPageImages: async (): Promise<PageImage[]> => {
-    const response = await axios.get(`${API_BASE_URL}/cms/page-images/`);
+  getBootstrap: async (): Promise<CmsBootstrap> => {
+    if (!bootstrapPromise) {
+      bootstrapPromise = axios
+        .get(`${API_BASE_URL}/cms/bootstrap/`)
+        .then((response) => response.data)
+        .catch((error) => {
+          bootstrapPromise = null;
+          throw error;
+        });
+    }
+    return bootstrapPromise;
+  },
+
+  getPageImages: async (filters: { position?: string; is_active?: boolean } = {}): Promise<PageImage[]> => {
+    const response = await axios.get(`${API_BASE_URL}/cms/page-images/`, { params: filters });
     return response.data;
   },
 
   getPageImageByPosition: async (position: string): Promise<PageImage | null> => {
-    const response = await axios.get(`${API_BASE_URL}/cms/page-images/`);
-    const images = response.data;
-    return images.find((img: PageImage) => img.position === position && img.is_active) || null;
+    const { page_images } = await cmsApi.getBootstrap();
+    return page_images[position]?.[0] || null;
   },
 
   getSiteSettings: async (): Promise<SiteSetting[]> => {
@@ -39,10 +60,8 @@ export const cmsApi = {
   },
 
   getSiteSetting: async (key: string): Promise<string | null> => {
-    const response = await axios.get(`${API_BASE_URL}/cms/settings/`);
-    const settings = response.data;
-    const setting = settings.find((s: SiteSetting) => s.key === key);
-    return setting ? setting.value : null;
+    const { settings } = await cmsApi.getBootstrap();
+    return settings[key] ?? null;
   },
 
   getSiteSettingsByCategory: async (category: string): Promise<SiteSetting[]> => {
@@ -52,12 +71,8 @@ export const cmsApi = {
   },
 
   getAllSiteSettingsMap: async (): Promise<Record<string, string>> => {
-    const settings = await cmsApi.getSiteSettings();
-    const map: Record<string, string> = {};
-    settings.forEach(setting => {
-      map[setting.key] = setting.value;
-    });
-    return map;
+    const { settings } = await cmsApi.getBootstrap();
+    return settings;
   },
 };
 
@@ -4,7 +4,9 @@ export interface Product {
   description: string;
   price: number;
   image: string;
+  image_srcset?: Record<string, string>;
   category: 'water_flosser' | 'electric_brush' | 'mouthwash';
+  stock?: number | null;
   created_at: string;
   updated_at: string;
 }